@@ -0,0 +1,92 @@
+
+# ========================================
+# DIET PLAN OPTIMIZER BENCHMARK
+# Solve time and target accuracy across doshas and calorie targets
+# ========================================
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enhanced_ayurvedic_healthcare_system import DOSHA_TYPES, EnhancedAyurvedicHealthcareSystem
+
+CALORIE_TARGETS = (1200, 1600, 2000, 2400, 2800, 3200)
+TIME_BUDGET_MS = 10.0
+
+def requirements_for(system: EnhancedAyurvedicHealthcareSystem, calories: int, gender: str) -> dict:
+    '''
+    Nutritional requirements for a reference patient, rescaled to the calorie target
+    '''
+    requirements = system.calculate_nutritional_requirements({'gender': gender})
+    ratio = calories / requirements['daily_calories']
+    requirements['daily_calories'] = calories
+    requirements['macronutrients'] = {
+        nutrient: value if nutrient == 'fiber' else round(value * ratio)
+        for nutrient, value in requirements['macronutrients'].items()
+    }
+    return requirements
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_benchmark(repeat: int = 200) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        system = EnhancedAyurvedicHealthcareSystem(
+            lazy=True,
+            users_db=os.path.join(workdir, 'users.db'),
+            patients_db=os.path.join(workdir, 'patients.db')
+        )
+        optimizer = system.diet_optimizer
+
+        # Warm up: imports the solver and builds the per-dosha matrices
+        for dosha in DOSHA_TYPES:
+            optimizer.solve(dosha, requirements_for(system, 2000, 'Male'))
+
+        results = {}
+        for dosha in DOSHA_TYPES:
+            for calories in CALORIE_TARGETS:
+                for gender in ('Male', 'Female'):
+                    requirements = requirements_for(system, calories, gender)
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        solution = optimizer.solve(dosha, requirements)
+                        timings.append((time.perf_counter() - start) * 1000)
+
+                    calorie_error = abs(solution['achieved']['calories'] - calories) / calories
+                    results[f'{dosha}/{calories}/{gender}'] = {
+                        'p50_ms': round(statistics.median(timings), 3),
+                        'p99_ms': round(percentile(timings, 0.99), 3),
+                        'calorie_error_pct': round(calorie_error * 100, 2),
+                        'within_budget': percentile(timings, 0.99) <= TIME_BUDGET_MS
+                    }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the nutrient-constrained diet plan optimizer')
+    parser.add_argument('--repeat', type=int, default=200, help='solves per scenario')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+    for name, stats in results.items():
+        flag = '' if stats['within_budget'] else '  OVER BUDGET'
+        print(f"{name:<22} p50 {stats['p50_ms']:>7.3f} ms  p99 {stats['p99_ms']:>7.3f} ms  "
+              f"calorie error {stats['calorie_error_pct']:>5.2f}%{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not all(stats['within_budget'] for stats in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+
+# ========================================
+# END-TO-END BENCHMARK SUITE
+# Public system paths at 1k / 100k / 1M assessment rows, with a regression gate
+# ========================================
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enhanced_ayurvedic_healthcare_system import DOSHA_TYPES, EnhancedAyurvedicHealthcareSystem
+from synthetic_data import SYNTHETIC_PASSWORD, SyntheticDataGenerator
+
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'end_to_end_baseline.json')
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def seed_databases(system: EnhancedAyurvedicHealthcareSystem, rows: int, seed: int = 42) -> dict:
+    '''
+    Fill both databases with `rows` synthetic assessments spread over
+    rows / 10 patients and rows / 1000 doctors
+    '''
+    doctors = max(rows // 1000, 5)
+    patients = max(rows // 10, 10)
+    stats = SyntheticDataGenerator(system, seed=seed).generate(doctors, patients, rows, plan_fraction=0.0)
+    return {'doctors': doctors, 'patients': patients,
+            'first_doctor': stats['first_doctor_id'], 'first_patient': stats['first_patient_id']}
+
+def measure(function, arguments: list) -> dict:
+    '''
+    Call function once per argument tuple and summarize latency and throughput
+    '''
+    timings = []
+    started = time.perf_counter()
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    elapsed = time.perf_counter() - started
+    return {
+        'calls': len(timings),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'throughput_per_s': round(len(timings) / elapsed, 1)
+    }
+
+def run_scale(rows: int, iterations: int, auth_iterations: int, seed: int = 42) -> dict:
+    '''
+    Seed fresh temporary databases at one scale and time every public path
+    '''
+    rng = np.random.default_rng(seed + 1)
+    with tempfile.TemporaryDirectory() as workdir:
+        # Report caching is disabled so every call measures the query path
+        system = EnhancedAyurvedicHealthcareSystem(
+            lazy=True,
+            users_db=os.path.join(workdir, 'users.db'),
+            patients_db=os.path.join(workdir, 'patients.db'),
+            report_cache_size=0
+        )
+        seed_start = time.perf_counter()
+        population = seed_databases(system, rows, seed)
+        seed_seconds = time.perf_counter() - seed_start
+
+        first_patient = population['first_patient']
+        patient_ids = rng.integers(first_patient, first_patient + population['patients'], iterations).tolist()
+        first_doctor = population['first_doctor']
+        doctor_ids = rng.integers(first_doctor, first_doctor + population['doctors'], iterations).tolist()
+        assessment_ids = rng.integers(1, rows + 1, iterations).tolist()
+        assessments = [
+            {'patient_id': patient_id, 'doctor_id': doctor_id, 'age': 40, 'gender': 'Female',
+             'height': 160, 'weight': 60, 'systolic_bp': 125, 'heart_rate': 78,
+             'body_frame': 'Thin', 'digestion': 'Quick', 'mental_state': 'Calm'}
+            for patient_id, doctor_id in zip(patient_ids, doctor_ids)
+        ]
+        requirements = system.calculate_nutritional_requirements({'gender': 'Female', 'weight': 60})
+
+        registrations = [
+            ({'email': f'new{rows}_{i}@bench.local', 'password': SYNTHETIC_PASSWORD, 'name': 'New Patient',
+              'emergency_contact': '9000000000'}, 'patient')
+            for i in range(auth_iterations)
+        ]
+        report_rows = system.conn_patients.execute(
+            f"SELECT id, patient_id, doctor_id FROM patient_assessments WHERE id IN ({','.join('?' * len(assessment_ids))})",
+            assessment_ids
+        ).fetchall()
+        report_by_id = {row[0]: (row[1], row[0], row[2]) for row in report_rows}
+
+        results = {
+            'register_user': measure(system.register_user, registrations),
+            'authenticate_user': measure(system.authenticate_user, [
+                (f'patient{first_patient + i % population["patients"]}@synthetic.local', SYNTHETIC_PASSWORD)
+                for i in range(auth_iterations)
+            ]),
+            'create_comprehensive_assessment': measure(
+                system.create_comprehensive_assessment, [(assessment,) for assessment in assessments]
+            ),
+            'diagnose_dosha_comprehensive': measure(
+                system.diagnose_dosha_comprehensive, [(assessment,) for assessment in assessments]
+            ),
+            'generate_weekly_diet_plan': measure(system.generate_weekly_diet_plan, [
+                (DOSHA_TYPES[i % len(DOSHA_TYPES)], requirements, {'exclude': [f'item{i}']})
+                for i in range(iterations)
+            ]),
+            'generate_professional_report': measure(
+                system.generate_professional_report, [report_by_id[i] for i in assessment_ids]
+            ),
+            'get_patient_progress': measure(
+                system.get_patient_progress, [(patient_id,) for patient_id in patient_ids]
+            )
+        }
+        system.close()
+
+    return {'rows': rows, 'seed_seconds': round(seed_seconds, 2), 'paths': results}
+
+def find_regressions(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list:
+    '''
+    Paths whose p50 latency exceeds the baseline by more than `tolerance`
+    and by more than min_delta_ms, so timer noise on microsecond paths is ignored
+    '''
+    regressions = []
+    for scale, current in results.items():
+        reference = baseline.get(scale, {}).get('paths', {})
+        for path, stats in current['paths'].items():
+            if path not in reference:
+                continue
+            limit = max(reference[path]['p50_ms'] * (1 + tolerance), reference[path]['p50_ms'] + min_delta_ms)
+            if stats['p50_ms'] > limit:
+                regressions.append(f"{scale} {path}: p50 {stats['p50_ms']:.3f} ms > {limit:.3f} ms "
+                                   f"(baseline {reference[path]['p50_ms']:.3f} ms)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the public healthcare system paths')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=list(SCALES))
+    parser.add_argument('--iterations', type=int, default=200, help='calls per path')
+    parser.add_argument('--auth-iterations', type=int, default=20,
+                        help='calls for register/authenticate, which are bound by password hashing')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='stored baseline results')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 slowdown vs baseline')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05, help='smallest p50 slowdown reported')
+    parser.add_argument('--update-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--no-baseline', action='store_true',
+                        help='only report results; skip the regression check against the baseline')
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales:
+        results[scale] = run_scale(SCALES[scale], args.iterations, args.auth_iterations)
+        print(f"[{scale}] seeded {SCALES[scale]} rows in {results[scale]['seed_seconds']:.2f}s")
+        for path, stats in results[scale]['paths'].items():
+            print(f"  {path:<34} p50 {stats['p50_ms']:>9.3f} ms  p99 {stats['p99_ms']:>9.3f} ms  "
+                  f"{stats['throughput_per_s']:>10.1f}/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        return
+
+    if args.no_baseline:
+        return
+    # A missing baseline fails the gate instead of silently passing it
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --update-baseline to store one '
+              f'or --no-baseline to skip the check', file=sys.stderr)
+        sys.exit(2)
+    with open(args.baseline) as f:
+        regressions = find_regressions(results, json.load(f), args.tolerance, args.min_delta_ms)
+    for regression in regressions:
+        print(f'REGRESSION {regression}', file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
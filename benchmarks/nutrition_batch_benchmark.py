@@ -0,0 +1,95 @@
+
+# ========================================
+# NUTRITIONAL REQUIREMENTS BATCH BENCHMARK
+# Vectorized batch against the per-patient loop, with an exact-match check
+# ========================================
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enhanced_ayurvedic_healthcare_system import (
+    NUTRITION_ACTIVITY_MULTIPLIERS, NUTRITION_BATCH_DTYPE, EnhancedAyurvedicHealthcareSystem
+)
+
+POPULATION_SIZES = (1000, 10000, 100000)
+
+def synthetic_population(size: int, seed: int = 7) -> dict:
+    '''
+    Column arrays of plausible adult profiles
+    '''
+    rng = np.random.default_rng(seed)
+    return {
+        'age': rng.integers(18, 90, size),
+        'gender': rng.choice(['Male', 'Female'], size),
+        'weight': np.round(rng.normal(68, 12, size).clip(35, 160), 1),
+        'height': np.round(rng.normal(165, 9, size).clip(130, 205), 1),
+        'exercise': rng.choice(list(NUTRITION_ACTIVITY_MULTIPLIERS), size)
+    }
+
+def flatten(requirements: dict) -> tuple:
+    '''
+    Per-patient result as a row in NUTRITION_BATCH_DTYPE field order
+    '''
+    flat = {'daily_calories': requirements['daily_calories'],
+            **requirements['macronutrients'], **requirements['micronutrients']}
+    return tuple(flat[name] for name in NUTRITION_BATCH_DTYPE.names)
+
+def run_benchmark(sizes=POPULATION_SIZES) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        system = EnhancedAyurvedicHealthcareSystem(
+            lazy=True,
+            users_db=os.path.join(workdir, 'users.db'),
+            patients_db=os.path.join(workdir, 'patients.db')
+        )
+        results = {}
+        for size in sizes:
+            columns = synthetic_population(size)
+            records = [dict(zip(columns, values)) for values in zip(*(columns[field].tolist() for field in columns))]
+
+            start = time.perf_counter()
+            expected = np.array([flatten(system.calculate_nutritional_requirements(record)) for record in records],
+                                dtype=NUTRITION_BATCH_DTYPE)
+            loop_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batch = system.calculate_nutritional_requirements_batch(columns)
+            batch_seconds = time.perf_counter() - start
+
+            results[str(size)] = {
+                'loop_ms': round(loop_seconds * 1000, 2),
+                'batch_ms': round(batch_seconds * 1000, 2),
+                'speedup': round(loop_seconds / batch_seconds, 1),
+                'batch_rows_per_second': round(size / batch_seconds),
+                'exact_match': bool(np.array_equal(batch, expected))
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batch nutritional requirement computation')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(POPULATION_SIZES), help='population sizes')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sizes)
+    for size, stats in results.items():
+        flag = '' if stats['exact_match'] else '  MISMATCH'
+        print(f"{size:>8} rows  loop {stats['loop_ms']:>10.2f} ms  batch {stats['batch_ms']:>8.2f} ms  "
+              f"speedup {stats['speedup']:>6.1f}x{flag}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not all(stats['exact_match'] for stats in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
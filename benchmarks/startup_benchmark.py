@@ -0,0 +1,96 @@
+
+# ========================================
+# STARTUP-TIME BENCHMARK
+# Cold start of enhanced_ayurvedic_healthcare_system in fresh interpreters
+# ========================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each scenario runs in a fresh interpreter and prints its elapsed seconds
+SCENARIOS = {
+    'import': '''
+import enhanced_ayurvedic_healthcare_system
+''',
+    'eager_init': '''
+import enhanced_ayurvedic_healthcare_system as m
+m.EnhancedAyurvedicHealthcareSystem()
+''',
+    'lazy_init': '''
+import enhanced_ayurvedic_healthcare_system as m
+m.EnhancedAyurvedicHealthcareSystem(lazy=True)
+''',
+    'lazy_first_diagnosis': '''
+import enhanced_ayurvedic_healthcare_system as m
+system = m.EnhancedAyurvedicHealthcareSystem(lazy=True)
+system.diagnose_dosha_comprehensive({'body_frame': 'Thin', 'heart_rate': 82})
+'''
+}
+
+TIMER = '''
+import sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{body}
+print(time.perf_counter() - start)
+'''
+
+def run_scenario(body: str, workdir: str) -> float:
+    '''
+    Run one scenario in a fresh interpreter and return its elapsed seconds
+    '''
+    code = TIMER.format(root=REPO_ROOT, body=body.strip())
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=workdir,
+        check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+def run_benchmark(repeat: int = 5) -> dict:
+    '''
+    Time every scenario `repeat` times and summarize in milliseconds
+    '''
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, body in SCENARIOS.items():
+            # Databases are created by the first run; remove them so every
+            # run measures the same cold path
+            timings = []
+            for _ in range(repeat):
+                for db_file in ('users.db', 'patients.db'):
+                    path = os.path.join(workdir, db_file)
+                    if os.path.exists(path):
+                        os.remove(path)
+                timings.append(run_scenario(body, workdir) * 1000)
+
+            results[name] = {
+                'median_ms': round(statistics.median(timings), 2),
+                'min_ms': round(min(timings), 2),
+                'max_ms': round(max(timings), 2),
+                'runs': repeat
+            }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start time of the healthcare system')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per scenario')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.repeat)
+    for name, stats in results.items():
+        print(f"{name:<22} median {stats['median_ms']:>9.2f} ms  (min {stats['min_ms']:.2f}, max {stats['max_ms']:.2f})")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
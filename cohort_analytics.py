@@ -0,0 +1,209 @@
+
+# ========================================
+# COHORT ANALYTICS
+# Out-of-core population statistics over patient_assessments
+# ========================================
+
+import math
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from enhanced_ayurvedic_healthcare_system import DOSHA_CATEGORICAL_WEIGHTS, DOSHA_TYPES
+
+COHORT_KEYS = ['age_band', 'gender', 'hospital_location']
+COHORT_METRICS = ('bmi', 'systolic_bp', 'diastolic_bp', 'fasting_glucose', 'post_meal_glucose')
+
+# Right-open age bands; ages outside every band (or missing) fall into 'Unknown'
+AGE_BAND_EDGES = (0, 18, 30, 45, 60, 75, 200)
+AGE_BAND_LABELS = ('0-17', '18-29', '30-44', '45-59', '60-74', '75+')
+UNKNOWN = 'Unknown'
+
+# Compact per-chunk dtypes: measurements fit float32 and every text field is
+# a categorical, so a chunk costs a few bytes per cell instead of a Python str
+COHORT_DTYPES = {
+    'age': 'float32',
+    'gender': 'category',
+    'hospital_location': 'category',
+    'diagnosed_dosha': pd.CategoricalDtype(DOSHA_TYPES),
+    **{metric: 'float32' for metric in COHORT_METRICS},
+    **{field: 'category' for field in DOSHA_CATEGORICAL_WEIGHTS}
+}
+
+def _cohort_query(with_users: bool) -> str:
+    '''
+    Assessment rows in an id range, joined to the assessing doctor's hospital
+    '''
+    location = "COALESCE(dp.hospital_location, 'Unknown')" if with_users else "'Unknown'"
+    join = 'LEFT JOIN users_db.doctor_profiles dp ON dp.user_id = a.doctor_id' if with_users else ''
+    fields = ', '.join(f'a.{field}' for field in DOSHA_CATEGORICAL_WEIGHTS)
+    metrics = ', '.join(f'a.{metric}' for metric in COHORT_METRICS)
+    return f'''
+        SELECT a.age, COALESCE(a.gender, 'Unknown') AS gender, {location} AS hospital_location,
+               a.diagnosed_dosha, {metrics}, {fields}
+        FROM patient_assessments a
+        {join}
+        WHERE a.id BETWEEN ? AND ?
+    '''
+
+def _age_bands(ages: pd.Series) -> pd.Categorical:
+    '''
+    Categorical age band per row with missing ages mapped to 'Unknown'
+    '''
+    bands = pd.cut(ages, bins=AGE_BAND_EDGES, labels=AGE_BAND_LABELS, right=False)
+    return bands.cat.add_categories([UNKNOWN]).fillna(UNKNOWN)
+
+def _partial_aggregates(chunk: pd.DataFrame) -> Dict:
+    '''
+    Mergeable sums for one chunk: per-cohort count, sum and sum of squares of
+    every metric, dosha counts per cohort and trait value counts per dosha
+    '''
+    chunk['age_band'] = _age_bands(chunk['age'])
+    grouped = chunk.groupby(COHORT_KEYS, observed=True, sort=False)
+
+    metrics = chunk[list(COHORT_METRICS)].astype('float64')
+    squares = metrics.pow(2).add_suffix('_sq')
+    counts = metrics.notna().astype('int64').add_suffix('_n')
+    frame = pd.concat([chunk[COHORT_KEYS], metrics, squares, counts], axis=1)
+    sums = frame.groupby(COHORT_KEYS, observed=True, sort=False).sum()
+    sums['assessments'] = grouped.size()
+
+    doshas = chunk.assign(diagnosed_dosha=chunk['diagnosed_dosha'].cat.add_categories([UNKNOWN]).fillna(UNKNOWN))
+    dosha_counts = doshas.groupby(COHORT_KEYS + ['diagnosed_dosha'], observed=True, sort=False).size()
+
+    traits = {
+        field: doshas.groupby(['diagnosed_dosha', field], observed=True, sort=False).size()
+        for field in DOSHA_CATEGORICAL_WEIGHTS
+    }
+    return {'sums': sums, 'doshas': dosha_counts, 'traits': traits, 'rows': len(chunk)}
+
+def _merge_partials(partials: List[Dict]) -> Optional[Dict]:
+    '''
+    Combine partial aggregates by summing on their group keys
+    '''
+    partials = [partial for partial in partials if partial is not None]
+    if not partials:
+        return None
+
+    def add(frames):
+        combined = pd.concat(frames)
+        return combined.groupby(level=list(range(combined.index.nlevels)), sort=False).sum()
+
+    return {
+        'sums': add([partial['sums'] for partial in partials]),
+        'doshas': add([partial['doshas'] for partial in partials]),
+        'traits': {
+            field: add([partial['traits'][field] for partial in partials])
+            for field in DOSHA_CATEGORICAL_WEIGHTS
+        },
+        'rows': sum(partial['rows'] for partial in partials)
+    }
+
+def aggregate_id_range(patients_db: str, users_db: Optional[str], first_id: int, last_id: int,
+                       chunk_size: int) -> Optional[Dict]:
+    '''
+    Stream one id range of patient_assessments in chunks and return its merged
+    partial aggregates. Top-level so it can run in a worker process.
+    '''
+    connection = sqlite3.connect(patients_db)
+    try:
+        if users_db:
+            connection.execute('ATTACH DATABASE ? AS users_db', (users_db,))
+        partial = None
+        chunks = pd.read_sql(_cohort_query(bool(users_db)), connection, params=(first_id, last_id),
+                             chunksize=chunk_size, dtype=COHORT_DTYPES)
+        for chunk in chunks:
+            # Fold each chunk in immediately so only one chunk is held at a time
+            partial = _merge_partials([partial, _partial_aggregates(chunk)])
+        return partial
+    finally:
+        connection.close()
+
+class CohortAnalytics:
+    '''
+    Dosha distribution and BMI / BP / glucose statistics by age band, gender
+    and hospital location, computed chunk by chunk so memory stays bounded
+    by chunk_size regardless of table size
+    '''
+
+    def __init__(self, patients_db: str = 'patients.db', users_db: Optional[str] = 'users.db',
+                 chunk_size: int = 100000):
+        self.patients_db = patients_db
+        self.users_db = users_db
+        self.chunk_size = chunk_size
+
+    def _id_ranges(self, parts: int) -> List[tuple]:
+        '''
+        Split the assessment id space into contiguous ranges for the workers
+        '''
+        connection = sqlite3.connect(self.patients_db)
+        try:
+            first_id, last_id = connection.execute(
+                'SELECT MIN(id), MAX(id) FROM patient_assessments'
+            ).fetchone()
+        finally:
+            connection.close()
+        if first_id is None:
+            return []
+        step = max(math.ceil((last_id - first_id + 1) / parts), 1)
+        return [(start, min(start + step - 1, last_id)) for start in range(first_id, last_id + 1, step)]
+
+    def compute(self, workers: int = 0) -> Dict:
+        '''
+        Run the aggregation serially (workers=0) or across worker processes,
+        each streaming its own id range, and return the cohort tables
+        '''
+        if workers and workers > 1:
+            # A few ranges per worker keeps the pool busy when ids are unevenly dense
+            ranges = self._id_ranges(workers * 4)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(aggregate_id_range, self.patients_db, self.users_db,
+                                    first_id, last_id, self.chunk_size)
+                    for first_id, last_id in ranges
+                ]
+                partials = [future.result() for future in futures]
+        else:
+            partials = [
+                aggregate_id_range(self.patients_db, self.users_db, first_id, last_id, self.chunk_size)
+                for first_id, last_id in self._id_ranges(1)
+            ]
+        return self._finalize(_merge_partials(partials))
+
+    def _finalize(self, merged: Optional[Dict]) -> Dict:
+        '''
+        Turn summed partials into count / mean / std per metric and dosha shares
+        '''
+        if merged is None:
+            return {'rows': 0, 'cohorts': pd.DataFrame(), 'dosha_distribution': pd.DataFrame(),
+                    'trait_distribution': {}}
+
+        sums = merged['sums'].sort_index()
+        cohorts = pd.DataFrame({'assessments': sums['assessments']}, index=sums.index)
+        for metric in COHORT_METRICS:
+            n = sums[f'{metric}_n']
+            mean = sums[metric] / n.where(n > 0)
+            # Sample variance from sum and sum of squares, clipped against rounding
+            variance = ((sums[f'{metric}_sq'] - n * mean ** 2) / (n - 1).where(n > 1)).clip(lower=0)
+            cohorts[f'{metric}_count'] = n
+            cohorts[f'{metric}_mean'] = mean
+            cohorts[f'{metric}_std'] = np.sqrt(variance)
+
+        dosha_distribution = merged['doshas'].unstack('diagnosed_dosha', fill_value=0).sort_index()
+        dosha_distribution = dosha_distribution.reindex(
+            columns=[*DOSHA_TYPES, UNKNOWN], fill_value=0
+        ).astype('int64')
+        shares = dosha_distribution.div(dosha_distribution.sum(axis=1), axis=0).add_suffix('_share')
+
+        return {
+            'rows': merged['rows'],
+            'cohorts': cohorts,
+            'dosha_distribution': pd.concat([dosha_distribution, shares], axis=1),
+            'trait_distribution': {
+                field: counts.unstack(field, fill_value=0).astype('int64')
+                for field, counts in merged['traits'].items()
+            }
+        }
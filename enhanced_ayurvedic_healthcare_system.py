@@ -4,173 +4,2338 @@
 # Complete Implementation with Multi-Language Support
 # ========================================
 
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_val_score
-from sklearn.preprocessing import LabelEncoder, StandardScaler, OneHotEncoder
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-import joblib
+import importlib
 import json
-from datetime import datetime, timedelta
+import csv
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
 import sqlite3
+import threading
+import queue
+import hashlib
+import heapq
+import bisect
+import struct
+import zlib
+import re
+import tempfile
+import multiprocessing
+from collections.abc import Mapping
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from werkzeug.security import generate_password_hash, check_password_hash
-import jwt
 from typing import Dict, List, Optional, Union
 import warnings
 warnings.filterwarnings('ignore')
 
+# Heavy dependencies are imported on first use so that importing this module
+# (CLI invocations, short-lived workers) does not pay for pandas/sklearn/jwt.
+# Names stay available as module attributes, e.g. module.pd or module.GridSearchCV.
+_LAZY_IMPORTS = {
+    'pd': ('pandas', None),
+    'RandomForestClassifier': ('sklearn.ensemble', 'RandomForestClassifier'),
+    'train_test_split': ('sklearn.model_selection', 'train_test_split'),
+    'GridSearchCV': ('sklearn.model_selection', 'GridSearchCV'),
+    'cross_val_score': ('sklearn.model_selection', 'cross_val_score'),
+    'LabelEncoder': ('sklearn.preprocessing', 'LabelEncoder'),
+    'StandardScaler': ('sklearn.preprocessing', 'StandardScaler'),
+    'OneHotEncoder': ('sklearn.preprocessing', 'OneHotEncoder'),
+    'classification_report': ('sklearn.metrics', 'classification_report'),
+    'confusion_matrix': ('sklearn.metrics', 'confusion_matrix'),
+    'accuracy_score': ('sklearn.metrics', 'accuracy_score'),
+    'lsq_linear': ('scipy.optimize', 'lsq_linear'),
+    'joblib': ('joblib', None),
+    'jwt': ('jwt', None)
+}
+
+def _lazy_import(name: str):
+    '''
+    Import a heavy dependency on first use and cache it as a module global
+    '''
+    if name in globals():
+        return globals()[name]
+    module_name, attribute = _LAZY_IMPORTS[name]
+    value = importlib.import_module(module_name)
+    if attribute:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+def __getattr__(name: str):
+    if name in _LAZY_IMPORTS:
+        return _lazy_import(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Dosha scoring rules shared by the per-assessment and batch scorers.
+# Weight vectors are ordered as DOSHA_TYPES.
+DOSHA_TYPES = ('Vata', 'Pitta', 'Kapha')
+
+DOSHA_CATEGORICAL_WEIGHTS = {
+    'body_frame': {'Thin': (3, 0, 0), 'Medium': (0, 3, 0), 'Heavy': (0, 0, 3)},
+    'skin_type': {'Dry': (2, 0, 0), 'Oily': (0, 2, 0), 'Normal': (0, 0, 2)},
+    'digestion': {'Quick': (2, 0, 0), 'Strong': (0, 2, 0), 'Slow': (0, 0, 2)},
+    'mental_state': {'Anxious': (2, 0, 0), 'Irritable': (0, 2, 0), 'Calm': (0, 0, 2)},
+    'sleep_pattern': {'Light sleeper': (1, 0, 0), 'Sound sleeper': (0, 0, 1)}
+}
+
+# Heart rate bands (research-backed), checked from the highest lower bound down:
+# Vata 80-90 bpm, Pitta 70-80 bpm, Kapha 60-70 bpm
+DOSHA_HEART_RATE_BANDS = (
+    (80, (2, 0, 0)),
+    (70, (0, 2, 0)),
+    (60, (0, 0, 2))
+)
+
+# Hypertension is often Pitta/Vata
+DOSHA_HYPERTENSION_SYSTOLIC = 140
+DOSHA_HYPERTENSION_WEIGHTS = (1, 1, 0)
+
+DOSHA_DEFAULT_CONFIDENCE = (0.33, 0.33, 0.34)
+DUAL_DOSHA_MARGIN = 0.2
+
+def _as_float_column(values) -> np.ndarray:
+    '''
+    Convert a column (list, array or Series) to floats with NaN for missing values
+    '''
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'biuf':
+        return arr.astype(float)
+    arr = arr.astype(object)
+    arr[np.equal(arr, None)] = np.nan
+    return arr.astype(float)
+
+def _column_length(data) -> int:
+    '''
+    Number of rows in a DataFrame or a mapping of column arrays
+    '''
+    if hasattr(data, 'columns'):
+        return len(data)
+    for values in data.values():
+        return len(values)
+    return 0
+
+# ========================================
+# SQLITE CONNECTION POOL
+# ========================================
+
+class SQLiteConnectionPool:
+    '''
+    Per-thread SQLite connections for one database file. Every thread gets its
+    own connection in WAL journal mode, so readers run in parallel with a
+    writer, and a busy timeout replaces immediate "database is locked" errors.
+    '''
+
+    def __init__(self, database: str, busy_timeout: float = 30.0,
+                 synchronous: str = 'NORMAL', cache_size_kb: int = 20000,
+                 cached_statements: int = 256):
+        self.database = database
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+        self.cache_size_kb = cache_size_kb
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}  # thread ident -> (thread, connection)
+
+    def _open(self) -> sqlite3.Connection:
+        '''
+        Open and tune a new connection for the calling thread
+        '''
+        # The pool guarantees one thread per connection; check_same_thread is
+        # disabled only so that close_all can close them from any thread.
+        # cached_statements keeps prepared statements for reuse per connection.
+        connection = sqlite3.connect(
+            self.database,
+            timeout=self.busy_timeout,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute(f'PRAGMA synchronous = {self.synchronous}')
+        connection.execute(f'PRAGMA cache_size = {-int(self.cache_size_kb)}')
+        connection.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout * 1000)}')
+        connection.execute('PRAGMA temp_store = MEMORY')
+        return connection
+
+    def connection(self) -> sqlite3.Connection:
+        '''
+        Return the calling thread's connection, opening it on first use
+        '''
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._open()
+            self._local.connection = connection
+            with self._lock:
+                self._prune_dead_threads()
+                current = threading.current_thread()
+                self._connections[current.ident] = (current, connection)
+        return connection
+
+    def _prune_dead_threads(self):
+        '''
+        Close connections left behind by threads that have exited
+        '''
+        for ident, (thread, connection) in list(self._connections.items()):
+            if not thread.is_alive():
+                connection.close()
+                del self._connections[ident]
+
+    def close_all(self):
+        '''
+        Close every connection owned by the pool
+        '''
+        with self._lock:
+            for thread, connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    @property
+    def size(self) -> int:
+        return len(self._connections)
+
+# ========================================
+# PASSWORD HASHING POOL
+# ========================================
+
+class PasswordHashingPool:
+    '''
+    Runs PBKDF2 password hashing and verification on a bounded process pool
+    so that login bursts do not hold the GIL of the serving process.
+    At most max_pending jobs are submitted at once; further callers wait
+    in a queue, which is reflected in the metrics.
+    '''
+
+    def __init__(self, max_workers: int = None, max_pending: int = None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'waiting': 0,
+            'max_waiting': 0,
+            'in_flight': 0,
+            'total_queue_wait': 0.0,
+            'total_service_time': 0.0
+        }
+
+    def _ensure_started(self):
+        '''
+        Start the worker processes on first use
+        '''
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self.max_workers or os.cpu_count() or 1
+                    self._slots = threading.BoundedSemaphore(self.max_pending or workers * 2)
+                    # Workers start on demand from a threaded server; forking it
+                    # could copy locks held by other threads into the child
+                    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context(method)
+                    )
+
+    def _run(self, function, *args):
+        '''
+        Submit one job once a slot is free and wait for its result
+        '''
+        self._ensure_started()
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._metrics['waiting'] += 1
+            self._metrics['max_waiting'] = max(self._metrics['max_waiting'], self._metrics['waiting'])
+
+        with self._slots:
+            started_at = time.perf_counter()
+            with self._lock:
+                self._metrics['waiting'] -= 1
+                self._metrics['in_flight'] += 1
+                self._metrics['submitted'] += 1
+                self._metrics['total_queue_wait'] += started_at - queued_at
+            try:
+                result = self._executor.submit(function, *args).result()
+                outcome = 'completed'
+            except Exception:
+                outcome = 'failed'
+                raise
+            finally:
+                with self._lock:
+                    self._metrics['in_flight'] -= 1
+                    self._metrics[outcome] += 1
+                    self._metrics['total_service_time'] += time.perf_counter() - started_at
+        return result
+
+    def hash_password(self, password: str) -> str:
+        return self._run(generate_password_hash, password)
+
+    def check_password(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def get_metrics(self) -> Dict:
+        '''
+        Snapshot of queueing and service-time counters
+        '''
+        with self._lock:
+            metrics = dict(self._metrics)
+        finished = metrics['completed'] + metrics['failed']
+        metrics['avg_queue_wait_ms'] = metrics['total_queue_wait'] / metrics['submitted'] * 1000 if metrics['submitted'] else 0.0
+        metrics['avg_service_ms'] = metrics['total_service_time'] / finished * 1000 if finished else 0.0
+        return metrics
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+# ========================================
+# SESSION TOKEN CACHE
+# ========================================
+
+# In production, use a proper secret key
+SESSION_TOKEN_SECRET = 'secret_key'
+SESSION_TOKEN_ALGORITHM = 'HS256'
+# Tokens missing any of these are rejected as invalid
+SESSION_TOKEN_REQUIRED_CLAIMS = ['exp', 'user_id', 'role']
+
+class SessionTokenCache:
+    '''
+    Bounded LRU cache of already-verified session tokens keyed by token
+    digest. Entries are dropped at their exp claim, so a hit never outlives
+    the token. Revoked digests are kept until the token would expire anyway.
+    '''
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # digest -> (payload, exp)
+        self._expiry_heap = []         # (exp, digest)
+        self._revoked = {}             # digest -> exp
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revoked_rejections = 0
+
+    @staticmethod
+    def digest(token) -> str:
+        if isinstance(token, str):
+            token = token.encode('utf-8')
+        return hashlib.sha256(token).hexdigest()
+
+    def _purge_expired(self, now: float):
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            exp, digest = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(digest)
+            if entry is not None and entry[1] == exp:
+                del self._entries[digest]
+                self.expirations += 1
+            if self._revoked.get(digest) == exp:
+                del self._revoked[digest]
+
+    def get(self, digest: str, now: float) -> Optional[Dict]:
+        '''
+        Return the cached payload for a digest, or None on a miss
+        '''
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, digest: str, payload: Dict, exp: float):
+        with self._lock:
+            self._entries[digest] = (payload, exp)
+            self._entries.move_to_end(digest)
+            heapq.heappush(self._expiry_heap, (exp, digest))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            # Stale heap entries for evicted digests are discarded lazily;
+            # rebuild when they dominate the heap
+            if len(self._expiry_heap) > 2 * self.max_size + len(self._revoked):
+                live = [(entry[1], key) for key, entry in self._entries.items()]
+                live.extend((exp, key) for key, exp in self._revoked.items())
+                heapq.heapify(live)
+                self._expiry_heap = live
+
+    def revoke(self, digest: str, exp: float):
+        with self._lock:
+            self._entries.pop(digest, None)
+            self._revoked[digest] = exp
+            heapq.heappush(self._expiry_heap, (exp, digest))
+
+    def is_revoked(self, digest: str) -> bool:
+        with self._lock:
+            revoked = digest in self._revoked
+            if revoked:
+                self.revoked_rejections += 1
+            return revoked
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'revoked': len(self._revoked),
+                'revoked_rejections': self.revoked_rejections
+            }
+
+# ========================================
+# REPORT CACHE
+# ========================================
+
+class ReportCache:
+    '''
+    Bounded LRU cache of professional reports keyed by assessment id, with
+    a TTL. Entries are indexed by patient and doctor so writes touching
+    either can invalidate exactly the affected reports, and carry the
+    profile version they were built at so profile changes made by any
+    process miss the cache. The TTL bounds staleness from other writes
+    made elsewhere.
+    Cached report dicts are shared between callers and must not be mutated.
+    '''
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # assessment_id -> (patient_id, doctor_id, stored_at, report, profile_version)
+        self._by_user = {}             # patient or doctor id -> {assessment_id}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _discard(self, assessment_id: int):
+        patient_id, doctor_id = self._entries.pop(assessment_id)[:2]
+        for user_id in (patient_id, doctor_id):
+            keys = self._by_user.get(user_id)
+            if keys is not None:
+                keys.discard(assessment_id)
+                if not keys:
+                    del self._by_user[user_id]
+
+    def get(self, assessment_id: int, patient_id: int, doctor_id: int, profile_version=None) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(assessment_id)
+            if entry is None or entry[:2] != (patient_id, doctor_id):
+                self.misses += 1
+                return None
+            if entry[4] != profile_version:
+                self._discard(assessment_id)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if time.monotonic() - entry[2] >= self.ttl:
+                self._discard(assessment_id)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(assessment_id)
+            self.hits += 1
+            return entry[3]
+
+    def put(self, assessment_id: int, patient_id: int, doctor_id: int, report: Dict, profile_version=None):
+        with self._lock:
+            if assessment_id in self._entries:
+                self._discard(assessment_id)
+            self._entries[assessment_id] = (patient_id, doctor_id, time.monotonic(), report, profile_version)
+            for user_id in (patient_id, doctor_id):
+                self._by_user.setdefault(user_id, set()).add(assessment_id)
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_users(self, user_ids):
+        '''
+        Drop every report that involves one of the given patients or doctors
+        '''
+        with self._lock:
+            for user_id in user_ids:
+                for assessment_id in list(self._by_user.get(user_id, ())):
+                    self._discard(assessment_id)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_user.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+# ========================================
+# COLUMNAR FOOD CATALOG
+# ========================================
+
+# Nutrient axis of the catalog matrix, values per 100g. Micronutrients found in
+# the food database but not listed here are appended in sorted order.
+FOOD_NUTRIENT_AXIS = (
+    'calories', 'protein', 'carbs', 'fat', 'fiber',
+    'iron', 'calcium', 'magnesium', 'potassium', 'phosphorus', 'folate',
+    'vitamin_a', 'vitamin_b1', 'vitamin_c', 'vitamin_k', 'curcumin'
+)
+FOOD_MACRO_FIELDS = {
+    'calories': 'calories_per_100g', 'protein': 'protein', 'carbs': 'carbs', 'fat': 'fat', 'fiber': 'fiber'
+}
+
+# Dosha effect levels in increasing suitability; the code is the index, -1 if unknown
+DOSHA_EFFECT_LEVELS = ('avoid', 'moderate', 'good', 'excellent')
+
+class FoodCatalog:
+    '''
+    Columnar view of the nested food database: a (foods x nutrients) matrix,
+    a name -> row index, int8 dosha-effect codes and a category code column.
+    Missing micronutrients are NaN, so range filters never match them.
+    '''
+
+    def __init__(self, food_database: Dict):
+        extra = sorted({
+            nutrient
+            for foods in food_database.values()
+            for food in foods.values()
+            for nutrient in food.get('micronutrients', {})
+        } - set(FOOD_NUTRIENT_AXIS))
+        self.nutrients = FOOD_NUTRIENT_AXIS + tuple(extra)
+        self.nutrient_index = {nutrient: i for i, nutrient in enumerate(self.nutrients)}
+        self.categories = tuple(food_database)
+        self.doshas = tuple(dosha.lower() for dosha in DOSHA_TYPES)
+
+        keys, names, category_codes, matrix_rows, effect_rows = [], [], [], [], []
+        for category_code, (category, foods) in enumerate(food_database.items()):
+            for key, food in foods.items():
+                row = np.full(len(self.nutrients), np.nan)
+                for nutrient, field in FOOD_MACRO_FIELDS.items():
+                    if food.get(field) is not None:
+                        row[self.nutrient_index[nutrient]] = food[field]
+                for nutrient, value in food.get('micronutrients', {}).items():
+                    row[self.nutrient_index[nutrient]] = value
+
+                effects = food.get('dosha_effects', {})
+                effect_rows.append([
+                    DOSHA_EFFECT_LEVELS.index(effects[dosha]) if effects.get(dosha) in DOSHA_EFFECT_LEVELS else -1
+                    for dosha in self.doshas
+                ])
+                keys.append(key)
+                names.append(food.get('name', key))
+                category_codes.append(category_code)
+                matrix_rows.append(row)
+
+        self.keys = np.array(keys, dtype=object)
+        self.names = np.array(names, dtype=object)
+        self.index = {key: i for i, key in enumerate(keys)}
+        self.category_codes = np.array(category_codes, dtype=np.int16)
+        self.matrix = np.array(matrix_rows, dtype=float).reshape(len(keys), len(self.nutrients))
+        self.dosha_effects = np.array(effect_rows, dtype=np.int8).reshape(len(keys), len(self.doshas))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def column(self, nutrient: str) -> np.ndarray:
+        '''
+        Per-100g values of one nutrient for every food
+        '''
+        return self.matrix[:, self.nutrient_index[nutrient]]
+
+    def mask(self, dosha: str = None, min_effect: str = 'good', category: str = None,
+             min_nutrients: Dict = None, max_nutrients: Dict = None) -> np.ndarray:
+        '''
+        Boolean row mask for foods matching every given condition, e.g.
+        mask('Pitta', min_nutrients={'protein': 20})
+        '''
+        selected = np.ones(len(self.keys), dtype=bool)
+        if dosha is not None:
+            dosha_column = self.dosha_effects[:, self.doshas.index(dosha.lower())]
+            selected &= dosha_column >= DOSHA_EFFECT_LEVELS.index(min_effect)
+        if category is not None:
+            if category not in self.categories:
+                return np.zeros(len(self.keys), dtype=bool)
+            selected &= self.category_codes == self.categories.index(category)
+        for nutrient, bound in (min_nutrients or {}).items():
+            selected &= self.column(nutrient) > bound
+        for nutrient, bound in (max_nutrients or {}).items():
+            selected &= self.column(nutrient) < bound
+        return selected
+
+    def query(self, **conditions) -> List[str]:
+        '''
+        Food keys matching the conditions accepted by mask()
+        '''
+        return self.keys[self.mask(**conditions)].tolist()
+
+    def rows(self, food_keys: List[str]) -> np.ndarray:
+        return np.fromiter((self.index[key] for key in food_keys), dtype=np.intp, count=len(food_keys))
+
+    def totals(self, food_keys: List[str], grams=None) -> Dict:
+        '''
+        Nutrient totals for a list of foods, 100g each unless grams are given.
+        Unknown micronutrient values count as zero.
+        '''
+        amounts = np.full(len(food_keys), 100.0) if grams is None else np.asarray(grams, dtype=float)
+        values = np.nan_to_num(self.matrix[self.rows(food_keys)])
+        return dict(zip(self.nutrients, ((amounts / 100.0) @ values).tolist()))
+
+# ========================================
+# NUTRITIONAL REQUIREMENTS
+# ========================================
+
+# Harris-Benedict BMR as (base, per kg, per cm, per year); any gender other
+# than male uses the female equation
+NUTRITION_BMR_COEFFICIENTS = {'male': (66, 13.7, 5, 6.8), 'female': (655, 9.6, 1.8, 4.7)}
+NUTRITION_ACTIVITY_MULTIPLIERS = {
+    'None': 1.2,
+    '1-2 days/week': 1.375,
+    '3-4 days/week': 1.55,
+    '5+ days/week': 1.725
+}
+NUTRITION_DEFAULT_MULTIPLIER = 1.55
+NUTRITION_DEFAULTS = {'age': 30, 'gender': 'Male', 'weight': 70, 'height': 170, 'exercise': 'Moderate'}
+
+# Share of calories per macronutrient and calories per gram
+NUTRITION_MACRO_SHARES = {'protein': (0.15, 4), 'carbohydrates': (0.60, 4), 'fat': (0.25, 9)}
+
+# Simplified RDA values (fiber g, micronutrients mg/mcg) by gender; any
+# gender other than female gets the male values
+NUTRITION_FIBER = {'male': 30, 'female': 25}
+NUTRITION_MICRONUTRIENTS = {
+    'male': {'iron': 10, 'calcium': 1000, 'vitamin_c': 65, 'vitamin_a': 900, 'folate': 400,
+             'vitamin_d': 15, 'magnesium': 420, 'potassium': 4700},
+    'female': {'iron': 18, 'calcium': 1000, 'vitamin_c': 65, 'vitamin_a': 700, 'folate': 400,
+               'vitamin_d': 15, 'magnesium': 320, 'potassium': 4700}
+}
+
+# Row layout of calculate_nutritional_requirements_batch
+NUTRITION_BATCH_DTYPE = np.dtype(
+    [('daily_calories', np.int64)]
+    + [(macro, np.int64) for macro in (*NUTRITION_MACRO_SHARES, 'fiber')]
+    + [(nutrient, np.int64) for nutrient in NUTRITION_MICRONUTRIENTS['male']]
+)
+
+# ========================================
+# DIET PLAN OPTIMIZER
+# ========================================
+
+# Daily upper bounds per item: grams of a food by category, servings of a recipe
+DIET_FOOD_MAX_GRAMS = {'grains': 350, 'pulses': 150, 'vegetables': 400, 'spices': 10}
+DIET_DEFAULT_MAX_GRAMS = 250
+DIET_RECIPE_MAX_SERVINGS = 3
+
+# Relative weight of each target in the least-squares objective
+DIET_TARGET_WEIGHTS = {'calories': 4.0, 'protein': 2.0, 'carbs': 2.0, 'fat': 2.0, 'fiber': 1.0}
+DIET_MICRONUTRIENT_WEIGHT = 0.5
+
+# Per-solve latency budget; over it, solve falls back to clipped least squares
+DIET_SOLVE_BUDGET_MS = 10.0
+
+class DietPlanOptimizer:
+    '''
+    Picks daily food amounts and recipe servings that best meet calorie,
+    macro and micronutrient targets, using only foods and recipes rated at
+    least 'good' for the dosha. Solved as a bounded least-squares problem on
+    relative target deviations; the per-dosha matrices are built once.
+    Recipes with a missing or unknown suitability level are left out.
+    '''
+
+    def __init__(self, catalog: FoodCatalog, recipe_database: Dict, min_effect: str = 'good'):
+        self.catalog = catalog
+        self.recipe_database = recipe_database
+        self.min_effect = min_effect
+        self._problems = {}
+        self._exact_solve_ms = {}  # dosha -> duration of its last exact solve
+
+    def _problem(self, dosha: str) -> Dict:
+        '''
+        Candidate items, their per-unit nutrient columns and bounds for a dosha
+        '''
+        key = dosha.lower()
+        if key in self._problems:
+            return self._problems[key]
+
+        catalog = self.catalog
+        food_rows = np.flatnonzero(catalog.mask(dosha=key, min_effect=self.min_effect))
+        # Per-gram nutrient values; unknown micronutrients contribute nothing
+        food_columns = np.nan_to_num(catalog.matrix[food_rows]).T / 100.0
+        food_bounds = [
+            DIET_FOOD_MAX_GRAMS.get(catalog.categories[code], DIET_DEFAULT_MAX_GRAMS)
+            for code in catalog.category_codes[food_rows]
+        ]
+
+        minimum = DOSHA_EFFECT_LEVELS.index(self.min_effect)
+        recipe_keys = []
+        for name, recipe in self.recipe_database.items():
+            level = recipe.get('dosha_suitability', {}).get(key)
+            if level in DOSHA_EFFECT_LEVELS and DOSHA_EFFECT_LEVELS.index(level) >= minimum:
+                recipe_keys.append(name)
+        recipe_columns = np.zeros((len(catalog.nutrients), len(recipe_keys)))
+        for j, name in enumerate(recipe_keys):
+            info = self.recipe_database[name].get('nutritional_info', {})
+            recipe_columns[catalog.nutrient_index['calories'], j] = info.get('calories_per_serving', 0)
+            for nutrient in ('protein', 'carbs', 'fat'):
+                recipe_columns[catalog.nutrient_index[nutrient], j] = info.get(nutrient, 0)
+
+        problem = {
+            'foods': catalog.keys[food_rows].tolist(),
+            'recipes': recipe_keys,
+            'matrix': np.hstack([food_columns, recipe_columns]),
+            'upper': np.array(food_bounds + [DIET_RECIPE_MAX_SERVINGS] * len(recipe_keys), dtype=float)
+        }
+        self._problems[key] = problem
+        return problem
+
+    def _targets(self, nutritional_req: Dict) -> Dict:
+        '''
+        Flatten calculate_nutritional_requirements output onto the nutrient axis
+        '''
+        macros = nutritional_req['macronutrients']
+        targets = {
+            'calories': nutritional_req['daily_calories'],
+            'protein': macros['protein'],
+            'carbs': macros['carbohydrates'],
+            'fat': macros['fat'],
+            'fiber': macros.get('fiber', 0)
+        }
+        for nutrient, value in nutritional_req.get('micronutrients', {}).items():
+            if nutrient in self.catalog.nutrient_index:
+                targets[nutrient] = value
+        return {nutrient: value for nutrient, value in targets.items() if value}
+
+    def solve(self, dosha: str, nutritional_req: Dict, exclude=(), max_iter: int = 50,
+              budget_ms: float = DIET_SOLVE_BUDGET_MS) -> Dict:
+        '''
+        Daily grams per food and servings per recipe for one patient.
+        The exact bounded solve runs only when its last duration for this
+        dosha fits in what is left of budget_ms; otherwise the unbounded
+        least-squares solution clipped to the bounds is returned instead,
+        with 'method' telling the two apart.
+        '''
+        start = time.perf_counter()
+        problem = self._problem(dosha)
+        lsq_linear = _lazy_import('lsq_linear')
+        # The budget covers per-request work, not the one-off problem build and import
+        budget_start = time.perf_counter()
+        targets = self._targets(nutritional_req)
+        index = self.catalog.nutrient_index
+
+        rows = [index[nutrient] for nutrient in targets]
+        target = np.array(list(targets.values()), dtype=float)
+        weights = np.array([
+            DIET_TARGET_WEIGHTS.get(nutrient, DIET_MICRONUTRIENT_WEIGHT) for nutrient in targets
+        ])
+
+        upper = problem['upper'].copy()
+        if exclude:
+            excluded = set(exclude)
+            for j, item in enumerate(problem['foods'] + problem['recipes']):
+                if item in excluded:
+                    upper[j] = 0.0
+
+        amounts = np.zeros(len(upper))
+        free = upper > 0
+        method = 'bvls'
+        if free.any():
+            # Minimize sum(w_k * ((A x)_k / t_k - 1)^2) subject to 0 <= x <= upper
+            scale = (weights / target)[:, None]
+            matrix = problem['matrix'][rows][:, free] * scale
+            key = dosha.lower()
+            estimate_ms = self._exact_solve_ms.get(key, 0.0)
+            if estimate_ms <= budget_ms - (time.perf_counter() - budget_start) * 1000:
+                solve_start = time.perf_counter()
+                result = lsq_linear(matrix, weights, bounds=(0.0, upper[free]), method='bvls', max_iter=max_iter)
+                self._exact_solve_ms[key] = (time.perf_counter() - solve_start) * 1000
+                amounts[free] = result.x
+            else:
+                method = 'clipped_lstsq'
+                amounts[free] = np.clip(np.linalg.lstsq(matrix, weights, rcond=None)[0], 0.0, upper[free])
+                # Decay the estimate so one slow solve does not rule out exact solves for good
+                self._exact_solve_ms[key] = estimate_ms / 2
+
+        achieved = problem['matrix'] @ amounts
+        n_foods = len(problem['foods'])
+        return {
+            'foods': {
+                food: round(float(grams)) for food, grams in zip(problem['foods'], amounts[:n_foods]) if grams >= 1
+            },
+            'recipes': {
+                recipe: round(float(servings), 1)
+                for recipe, servings in zip(problem['recipes'], amounts[n_foods:]) if servings >= 0.1
+            },
+            'targets': targets,
+            'achieved': {nutrient: round(float(achieved[index[nutrient]]), 1) for nutrient in targets},
+            'method': method,
+            'solve_time_ms': (time.perf_counter() - start) * 1000
+        }
+
+# ========================================
+# RECIPE INVERTED INDEX
+# ========================================
+
+class RecipeIndex:
+    '''
+    Inverted index over the recipe database. Each ingredient, (dosha,
+    suitability level) and difficulty maps to a bitset (a Python int with
+    one bit per recipe id); cooking times are kept on a sorted axis.
+    Queries intersect bitsets, and adding a recipe only touches its own postings.
+    '''
+
+    def __init__(self, recipe_database: Dict = None):
+        self.keys = []            # recipe id -> key (None once removed)
+        self.ids = {}             # key -> recipe id
+        self.by_ingredient = {}
+        self.by_suitability = {}  # (dosha, level) -> bitset
+        self.by_difficulty = {}
+        self.cooking_times = []   # sorted (cooking_time, recipe id)
+        self._postings = {}       # recipe id -> (posting keys, cooking time entry)
+        self.all_recipes = 0
+        for key, recipe in (recipe_database or {}).items():
+            self.add(key, recipe)
+
+    def add(self, key: str, recipe: Dict):
+        '''
+        Index a new recipe, or re-index an existing key in place
+        '''
+        if key in self.ids:
+            recipe_id = self.ids[key]
+            self._unindex(recipe_id)
+        else:
+            recipe_id = len(self.keys)
+            self.keys.append(key)
+            self.ids[key] = recipe_id
+        bit = 1 << recipe_id
+
+        postings = []
+        for ingredient in recipe.get('ingredients', []):
+            postings.append((self.by_ingredient, ingredient['name']))
+        for dosha, level in recipe.get('dosha_suitability', {}).items():
+            postings.append((self.by_suitability, (dosha.lower(), level)))
+        if recipe.get('difficulty'):
+            postings.append((self.by_difficulty, recipe['difficulty'].lower()))
+        for index, posting_key in postings:
+            index[posting_key] = index.get(posting_key, 0) | bit
+
+        time_entry = None
+        if recipe.get('cooking_time') is not None:
+            time_entry = (recipe['cooking_time'], recipe_id)
+            bisect.insort(self.cooking_times, time_entry)
+
+        self._postings[recipe_id] = (postings, time_entry)
+        self.all_recipes |= bit
+
+    def remove(self, key: str):
+        recipe_id = self.ids.pop(key)
+        self._unindex(recipe_id)
+        self.keys[recipe_id] = None
+
+    def _unindex(self, recipe_id: int):
+        bit = 1 << recipe_id
+        postings, time_entry = self._postings.pop(recipe_id)
+        for index, posting_key in postings:
+            remaining = index[posting_key] & ~bit
+            if remaining:
+                index[posting_key] = remaining
+            else:
+                del index[posting_key]
+        if time_entry is not None:
+            del self.cooking_times[bisect.bisect_left(self.cooking_times, time_entry)]
+        self.all_recipes &= ~bit
+
+    def _filter_cooking_time(self, bits: int, min_time: float = None, max_time: float = None) -> int:
+        '''
+        Restrict a bitset to a cooking time range, walking whichever is
+        smaller: the candidate bits or the matching slice of the time axis
+        '''
+        lo = 0 if min_time is None else bisect.bisect_left(self.cooking_times, (min_time, -1))
+        hi = len(self.cooking_times) if max_time is None else bisect.bisect_right(self.cooking_times, (max_time, float('inf')))
+
+        if bits.bit_count() <= hi - lo:
+            filtered = 0
+            for recipe_id in self._iter_ids(bits):
+                time_entry = self._postings[recipe_id][1]
+                if time_entry is not None and (min_time is None or time_entry[0] >= min_time) \
+                        and (max_time is None or time_entry[0] <= max_time):
+                    filtered |= 1 << recipe_id
+            return filtered
+
+        in_range = 0
+        for _, recipe_id in self.cooking_times[lo:hi]:
+            in_range |= 1 << recipe_id
+        return bits & in_range
+
+    @staticmethod
+    def _iter_ids(bits: int):
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def search(self, ingredients=(), dosha: str = None, min_suitability: str = 'good',
+               difficulty: str = None, max_cooking_time: float = None, min_cooking_time: float = None) -> List[str]:
+        '''
+        Recipe keys using every listed ingredient and meeting the other filters,
+        e.g. search(['moong_dal'], dosha='Kapha', min_suitability='excellent', max_cooking_time=30)
+        '''
+        result = self.all_recipes
+        for ingredient in ingredients:
+            result &= self.by_ingredient.get(ingredient, 0)
+        if dosha is not None:
+            suitable = 0
+            for level in DOSHA_EFFECT_LEVELS[DOSHA_EFFECT_LEVELS.index(min_suitability):]:
+                suitable |= self.by_suitability.get((dosha.lower(), level), 0)
+            result &= suitable
+        if difficulty is not None:
+            result &= self.by_difficulty.get(difficulty.lower(), 0)
+        if result and (max_cooking_time is not None or min_cooking_time is not None):
+            result = self._filter_cooking_time(result, min_cooking_time, max_cooking_time)
+
+        return [self.keys[recipe_id] for recipe_id in self._iter_ids(result)]
+
+# ========================================
+# SHOPPING LIST AGGREGATION
+# ========================================
+
+# Grams per unit; (ingredient, unit) overrides take precedence
+UNIT_GRAMS = {'g': 1, 'kg': 1000, 'cup': 200, 'tbsp': 15, 'tsp': 5, 'inch piece': 5}
+INGREDIENT_UNIT_GRAMS = {
+    ('basmati_rice', 'cup'): 185,
+    ('brown_rice', 'cup'): 190,
+    ('moong_dal', 'cup'): 205,
+    ('chana_dal', 'cup'): 200,
+    ('turmeric', 'tsp'): 3,
+    ('cumin_seeds', 'tsp'): 2,
+    ('ghee', 'tbsp'): 13,
+    ('ginger', 'inch piece'): 6
+}
+
+# Meal text keyword -> recipe key; the longest matching keyword wins
+MEAL_RECIPE_KEYWORDS = {
+    'khichdi': 'khichdi',
+    'dal tadka': 'dal_tadka',
+    'dal': 'dal_tadka'
+}
+
+def ingredient_grams(ingredient: Dict) -> float:
+    '''
+    Normalize one recipe ingredient quantity to grams
+    '''
+    unit = ingredient.get('unit', 'g')
+    grams_per_unit = INGREDIENT_UNIT_GRAMS.get((ingredient['name'], unit), UNIT_GRAMS.get(unit))
+    if grams_per_unit is None:
+        raise ValueError(f"Unknown unit {unit!r} for {ingredient['name']}")
+    return ingredient['quantity'] * grams_per_unit
+
+class ShoppingListEngine:
+    '''
+    Turns diet plans into ingredient quantities. Recipes are compiled once
+    into a (recipes x ingredients) grams-per-serving matrix, so any number of
+    plans aggregates to a single servings vector and one matrix product.
+    '''
+
+    def __init__(self, recipe_database: Dict, food_keys=()):
+        self.recipe_database = recipe_database
+        self.recipes = tuple(recipe_database)
+        self.recipe_index = {key: i for i, key in enumerate(self.recipes)}
+
+        ingredients = list(food_keys)
+        for recipe in recipe_database.values():
+            for ingredient in recipe['ingredients']:
+                if ingredient['name'] not in ingredients:
+                    ingredients.append(ingredient['name'])
+        self.ingredients = tuple(ingredients)
+        self.ingredient_index = {name: i for i, name in enumerate(self.ingredients)}
+
+        self.grams_per_serving = np.zeros((len(self.recipes), len(self.ingredients)))
+        for i, recipe in enumerate(recipe_database.values()):
+            serves = recipe.get('serves') or 1
+            for ingredient in recipe['ingredients']:
+                self.grams_per_serving[i, self.ingredient_index[ingredient['name']]] += \
+                    ingredient_grams(ingredient) / serves
+
+        self._keywords = sorted(
+            ((keyword, recipe) for keyword, recipe in MEAL_RECIPE_KEYWORDS.items() if recipe in self.recipe_index),
+            key=lambda item: len(item[0]), reverse=True
+        )
+        self._meal_recipes = {}
+
+    def meal_recipe(self, meal: str) -> int:
+        '''
+        Recipe row for a meal description, or -1 when no recipe matches
+        '''
+        row = self._meal_recipes.get(meal)
+        if row is None:
+            text = meal.lower()
+            row = next((self.recipe_index[recipe] for keyword, recipe in self._keywords if keyword in text), -1)
+            self._meal_recipes[meal] = row
+        return row
+
+    def _weekly_servings(self, weekly_meals: Dict) -> np.ndarray:
+        rows = [self.meal_recipe(meal) for meals in weekly_meals.values() for meal in meals.values()]
+        rows = np.array([row for row in rows if row >= 0], dtype=np.intp)
+        return np.bincount(rows, minlength=len(self.recipes)).astype(float)
+
+    def aggregate(self, plans, servings_per_meal: float = 1.0, days: int = 7) -> np.ndarray:
+        '''
+        Total grams per ingredient over plans (diet plans or weekly_meals dicts).
+        A plan with an optimized_daily_intake is procured from that intake,
+        otherwise from its weekly meal rotation, never from both.
+        '''
+        servings = np.zeros(len(self.recipes))
+        direct_grams = np.zeros(len(self.ingredients))
+        # Memoized plans share their weekly_meals object, so count each once
+        shared_counts = {}
+
+        for plan in plans:
+            intake = plan.get('optimized_daily_intake')
+            if intake:
+                for recipe, daily_servings in intake.get('recipes', {}).items():
+                    if recipe in self.recipe_index:
+                        servings[self.recipe_index[recipe]] += daily_servings * days
+                for food, grams in intake.get('foods', {}).items():
+                    if food in self.ingredient_index:
+                        direct_grams[self.ingredient_index[food]] += grams * days
+                continue
+
+            weekly_meals = plan.get('weekly_meals', plan)
+            counted = shared_counts.get(id(weekly_meals))
+            if counted is None:
+                counted = shared_counts[id(weekly_meals)] = [weekly_meals, self._weekly_servings(weekly_meals), 0]
+            counted[2] += 1
+
+        for _, counts, plan_count in shared_counts.values():
+            servings += counts * plan_count * servings_per_meal
+
+        return servings @ self.grams_per_serving + direct_grams
+
+    def order(self, plans, servings_per_meal: float = 1.0, days: int = 7) -> Dict:
+        '''
+        Ingredient -> grams, largest quantities first, zero rows dropped
+        '''
+        totals = self.aggregate(plans, servings_per_meal, days)
+        nonzero = np.flatnonzero(totals > 0)
+        ordered = nonzero[np.argsort(-totals[nonzero], kind='stable')]
+        return {self.ingredients[i]: round(float(totals[i]), 1) for i in ordered}
+
+# ========================================
+# DIET PLAN TEMPLATES AND MEMOIZATION
+# ========================================
+
+# Base meal plans by dosha
+DOSHA_BASE_PLANS = {
+    'Vata': {
+        'principles': ['Warm foods', 'Regular meals', 'Healthy fats', 'Sweet, sour, salty tastes'],
+        'avoid': ['Cold foods', 'Dry foods', 'Irregular eating'],
+        'daily_template': {
+            'breakfast': ['Warm oatmeal with ghee and dates', 'Hot cereal with nuts', 'Warm milk with spices'],
+            'lunch': ['Khichdi with vegetables', 'Rice with dal and cooked vegetables', 'Warm soup with bread'],
+            'dinner': ['Light khichdi', 'Vegetable soup', 'Rice with dal'],
+            'snacks': ['Dates and nuts', 'Warm milk', 'Herbal tea with biscuits']
+        }
+    },
+    'Pitta': {
+        'principles': ['Cool foods', 'Moderate portions', 'Sweet, bitter, astringent tastes'],
+        'avoid': ['Spicy foods', 'Sour foods', 'Excessive heat'],
+        'daily_template': {
+            'breakfast': ['Cool porridge with coconut', 'Fresh fruit salad', 'Mild cereals'],
+            'lunch': ['Rice with cooling vegetables', 'Salad with yogurt', 'Light dal with rice'],
+            'dinner': ['Light salad', 'Cooling soups', 'Rice with mild curry'],
+            'snacks': ['Sweet fruits', 'Coconut water', 'Milk-based drinks']
+        }
+    },
+    'Kapha': {
+        'principles': ['Light foods', 'Warm spices', 'Pungent, bitter, astringent tastes'],
+        'avoid': ['Heavy foods', 'Cold foods', 'Excessive dairy'],
+        'daily_template': {
+            'breakfast': ['Herbal tea with light snacks', 'Spiced porridge', 'Fresh fruits'],
+            'lunch': ['Barley with spiced vegetables', 'Light dal with vegetables', 'Quinoa salad'],
+            'dinner': ['Vegetable soup', 'Light curry with millet', 'Herbal tea'],
+            'snacks': ['Spiced tea', 'Light crackers', 'Ginger preparations']
+        }
+    }
+}
+
+DOSHA_COOKING_TIPS = {
+    'Vata': [
+        'Cook with warming spices like ginger and cinnamon',
+        'Use adequate oil or ghee in cooking',
+        'Prefer steaming and sautéing over raw preparations',
+        'Eat meals warm and at regular times'
+    ],
+    'Pitta': [
+        'Use cooling spices like coriander and fennel',
+        'Avoid excessive heating and frying',
+        'Include fresh herbs like cilantro and mint',
+        'Cook with coconut oil or moderate ghee'
+    ],
+    'Kapha': [
+        'Use warming spices like black pepper and mustard seeds',
+        'Minimize oil and heavy ingredients',
+        'Prefer baking, roasting, and steaming',
+        'Include plenty of vegetables and light proteins'
+    ]
+}
+
+WEEK_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+# Days covered by each diet_plans.plan_type
+PLAN_HORIZON_DAYS = {'weekly': 7, 'monthly': 30, 'quarterly': 90}
+
+# Target rounding used to share memoized optimizer solutions between patients
+PLAN_CALORIE_BUCKET = 50
+PLAN_MACRO_BUCKET = 5
+
+class FrozenDict(dict):
+    '''
+    Read-only dict for plan fragments shared between callers. Still a dict,
+    so it serializes to JSON like the mutable plans it replaces.
+    '''
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('shared plan fragments are read-only; copy before modifying')
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # The default dict pickling refills through __setitem__
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        import copy
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+def freeze_plan(value):
+    '''
+    Recursively convert dicts to FrozenDict and lists to tuples; callers
+    that expose a frozen list field convert it back with list()
+    '''
+    if isinstance(value, dict):
+        return value if isinstance(value, FrozenDict) else FrozenDict(
+            (key, freeze_plan(item)) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_plan(item) for item in value)
+    return value
+
+class PlanMemo:
+    '''
+    LRU memo of immutable plan fragments keyed by canonical plan inputs
+    '''
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_build(self, key, builder, cacheable=None):
+        '''
+        Memoized value for key, built on a miss; a value rejected by
+        cacheable(value) is returned without being stored
+        '''
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Built outside the lock; a concurrent duplicate build is harmless
+        value = freeze_plan(builder())
+        if cacheable is not None and not cacheable(value):
+            return value
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+def _canonical_preferences(dietary_preferences: Dict):
+    '''
+    Hashable, order-independent form of dietary preferences
+    '''
+    return json.dumps(dietary_preferences or {}, sort_keys=True, default=sorted)
+
+def _bucket_requirements(nutritional_req: Dict) -> Dict:
+    '''
+    Round calorie and macro targets to the memo buckets
+    '''
+    macros = dict(nutritional_req['macronutrients'])
+    for nutrient in ('protein', 'carbohydrates', 'fat'):
+        macros[nutrient] = int(round(macros[nutrient] / PLAN_MACRO_BUCKET) * PLAN_MACRO_BUCKET)
+    return {
+        'daily_calories': int(round(nutritional_req['daily_calories'] / PLAN_CALORIE_BUCKET) * PLAN_CALORIE_BUCKET),
+        'macronutrients': macros,
+        'micronutrients': dict(nutritional_req.get('micronutrients', {}))
+    }
+
+# ========================================
+# COMPACT PLAN ENCODING
+# ========================================
+
+# Binary plan blobs start with a format byte; payloads of at least
+# PLAN_COMPRESS_MIN_BYTES are zlib-compressed when that makes them smaller.
+# Stored plans are JSON TEXT or binary BLOBs and are told apart by SQLite type.
+PLAN_FORMAT_RAW = 1
+PLAN_FORMAT_ZLIB = 2
+PLAN_COMPRESS_MIN_BYTES = 64
+
+_TAG_NONE, _TAG_TRUE, _TAG_FALSE, _TAG_INT, _TAG_FLOAT, _TAG_STR, _TAG_LIST, _TAG_DICT = range(8)
+_DOUBLE = struct.Struct('<d')
+
+class PlanStringTable:
+    '''
+    Dictionary of meal, recipe and other plan strings stored in plan_strings,
+    cached in memory in both directions. New strings are interned on a
+    dedicated connection that commits at once, so a cached id always refers
+    to a committed row whatever happens to the caller's transaction.
+    Encode plans before opening a write transaction on the same database:
+    interning a new string takes the write lock, so intern fails fast when
+    the caller's connection already holds a transaction.
+    '''
+
+    def __init__(self, database: str, busy_timeout: float = 30.0):
+        self.database = database
+        self.busy_timeout = busy_timeout
+        self._ids = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def _db(self) -> sqlite3.Connection:
+        # Called with the lock held; autocommit mode, shared by all threads
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.database, timeout=self.busy_timeout, check_same_thread=False, isolation_level=None
+            )
+        return self._connection
+
+    def intern(self, value: str, connection: sqlite3.Connection = None) -> int:
+        string_id = self._ids.get(value)
+        if string_id is None:
+            if connection is not None and connection.in_transaction:
+                # Waiting for the write lock would only wait for the caller itself
+                raise RuntimeError('Cannot intern plan strings inside an open transaction; '
+                                   'encode plans before writing them')
+            with self._lock:
+                connection = self._db()
+                connection.execute('INSERT OR IGNORE INTO plan_strings (value) VALUES (?)', (value,))
+                string_id = connection.execute('SELECT id FROM plan_strings WHERE value = ?', (value,)).fetchone()[0]
+                self._ids[value] = string_id
+                self._values[string_id] = value
+        return string_id
+
+    def lookup(self, string_id: int) -> str:
+        value = self._values.get(string_id)
+        if value is None:
+            # Written by another process since the cache was filled
+            with self._lock:
+                row = self._db().execute('SELECT value FROM plan_strings WHERE id = ?', (string_id,)).fetchone()
+                if row is None:
+                    raise KeyError(f'Unknown plan string id {string_id}')
+                value = row[0]
+                self._ids[value] = string_id
+                self._values[string_id] = value
+        return value
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, position: int):
+    result = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
+
+def encode_plan(value, strings: PlanStringTable, connection: sqlite3.Connection = None) -> bytes:
+    '''
+    Encode a JSON-compatible plan structure as a compact binary blob with
+    every string (keys included) replaced by its interned id. connection is
+    the caller's own connection, checked for an open transaction.
+    '''
+    out = bytearray()
+
+    def write(item):
+        if item is None:
+            out.append(_TAG_NONE)
+        elif item is True:
+            out.append(_TAG_TRUE)
+        elif item is False:
+            out.append(_TAG_FALSE)
+        elif isinstance(item, int):
+            out.append(_TAG_INT)
+            _write_varint(out, (item << 1) if item >= 0 else ((-item << 1) - 1))
+        elif isinstance(item, float):
+            out.append(_TAG_FLOAT)
+            out.extend(_DOUBLE.pack(item))
+        elif isinstance(item, str):
+            out.append(_TAG_STR)
+            _write_varint(out, strings.intern(item, connection))
+        elif isinstance(item, Mapping):
+            out.append(_TAG_DICT)
+            _write_varint(out, len(item))
+            for key, child in item.items():
+                _write_varint(out, strings.intern(str(key), connection))
+                write(child)
+        elif isinstance(item, (list, tuple)):
+            out.append(_TAG_LIST)
+            _write_varint(out, len(item))
+            for child in item:
+                write(child)
+        else:
+            raise TypeError(f'Cannot encode {type(item).__name__} in a plan')
+
+    write(value)
+    if len(out) >= PLAN_COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(bytes(out), 6)
+        if len(compressed) < len(out):
+            return bytes([PLAN_FORMAT_ZLIB]) + compressed
+    return bytes([PLAN_FORMAT_RAW]) + bytes(out)
+
+def decode_plan(blob: bytes, strings: PlanStringTable):
+    '''
+    Decode a blob written by encode_plan back to dicts, lists and scalars
+    '''
+    data = zlib.decompress(blob[1:]) if blob[0] == PLAN_FORMAT_ZLIB else blob[1:]
+
+    def read(position):
+        tag = data[position]
+        position += 1
+        if tag == _TAG_NONE:
+            return None, position
+        if tag == _TAG_TRUE:
+            return True, position
+        if tag == _TAG_FALSE:
+            return False, position
+        if tag == _TAG_INT:
+            zigzag, position = _read_varint(data, position)
+            return (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1), position
+        if tag == _TAG_FLOAT:
+            return _DOUBLE.unpack_from(data, position)[0], position + _DOUBLE.size
+        if tag == _TAG_STR:
+            string_id, position = _read_varint(data, position)
+            return strings.lookup(string_id), position
+        length, position = _read_varint(data, position)
+        if tag == _TAG_LIST:
+            items = []
+            for _ in range(length):
+                item, position = read(position)
+                items.append(item)
+            return items, position
+        items = {}
+        for _ in range(length):
+            string_id, position = _read_varint(data, position)
+            items[strings.lookup(string_id)], position = read(position)
+        return items, position
+
+    return read(0)[0]
+
+_NOT_DECODED = object()
+
+class LazyPlanData(Mapping):
+    '''
+    Read-only view of a stored plan column that decodes on first access.
+    A stored null (SQL NULL, JSON null or an encoded None) reads as {}.
+    '''
+
+    def __init__(self, stored, strings: PlanStringTable):
+        self._stored = stored
+        self._strings = strings
+        self._decoded = _NOT_DECODED
+
+    def _value(self) -> Dict:
+        if self._decoded is _NOT_DECODED:
+            if isinstance(self._stored, bytes):
+                decoded = decode_plan(self._stored, self._strings)
+            else:
+                decoded = json.loads(self._stored) if self._stored else None
+            self._decoded = {} if decoded is None else decoded
+            self._stored = None
+        return self._decoded
+
+    def __getitem__(self, key):
+        return self._value()[key]
+
+    def __iter__(self):
+        return iter(self._value())
+
+    def __len__(self) -> int:
+        return len(self._value())
+
+    def to_dict(self) -> Dict:
+        return self._value()
+
+# ========================================
+# SCHEMA MIGRATIONS
+# ========================================
+
+# Ordered (version, description, statements) per database. The applied version
+# is tracked in PRAGMA user_version, so existing databases are upgraded in
+# place by running only the migrations above their recorded version.
+# Append new migrations; never edit one that has shipped.
+USERS_DB_MIGRATIONS = [
+    (1, 'initial schema', [
+        # User management database
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT NOT NULL,
+            name TEXT NOT NULL,
+            phone TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+        ''',
+        # Admin specific fields
+        '''
+        CREATE TABLE IF NOT EXISTS admin_profiles (
+            user_id INTEGER PRIMARY KEY,
+            govt_employee_id TEXT UNIQUE,
+            job_location TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        # Doctor specific fields
+        '''
+        CREATE TABLE IF NOT EXISTS doctor_profiles (
+            user_id INTEGER PRIMARY KEY,
+            license_number TEXT UNIQUE NOT NULL,
+            govt_id TEXT,
+            hospital_location TEXT,
+            practice_years INTEGER,
+            specialization TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        # Patient specific fields
+        '''
+        CREATE TABLE IF NOT EXISTS patient_profiles (
+            user_id INTEGER PRIMARY KEY,
+            emergency_contact TEXT,
+            assigned_doctor_id INTEGER,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (assigned_doctor_id) REFERENCES users (id)
+        )
+        '''
+    ]),
+    (2, 'secondary indexes', [
+        'CREATE INDEX IF NOT EXISTS idx_users_role ON users (role, is_active)',
+        'CREATE INDEX IF NOT EXISTS idx_patient_profiles_doctor ON patient_profiles (assigned_doctor_id)'
+    ]),
+    # Bumped by triggers on any profile write, whichever process makes it,
+    # so cached reports can tell that a patient or doctor row has changed
+    (3, 'per-user profile versions', [
+        '''
+        CREATE TABLE IF NOT EXISTS profile_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        ''',
+        *(
+            f'''
+            CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_version AFTER {event} ON {table}
+            BEGIN
+                INSERT INTO profile_versions (user_id, version) VALUES ({row}.{column}, 1)
+                ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+            END
+            '''
+            for table, column in (('users', 'id'), ('doctor_profiles', 'user_id'), ('patient_profiles', 'user_id'))
+            for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD'))
+        )
+    ])
+]
+
+PATIENTS_DB_MIGRATIONS = [
+    (1, 'initial schema', [
+        # Patient assessments database
+        '''
+        CREATE TABLE IF NOT EXISTS patient_assessments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            assessment_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+            -- Demographics
+            age INTEGER,
+            gender TEXT,
+            height REAL,
+            weight REAL,
+            bmi REAL,
+            occupation TEXT,
+
+            -- Vital Signs
+            systolic_bp INTEGER,
+            diastolic_bp INTEGER,
+            heart_rate INTEGER,
+            temperature REAL,
+            respiratory_rate INTEGER,
+            oxygen_saturation REAL,
+
+            -- Blood Parameters
+            fasting_glucose REAL,
+            post_meal_glucose REAL,
+            total_cholesterol REAL,
+            hdl_cholesterol REAL,
+            ldl_cholesterol REAL,
+
+            -- Lifestyle
+            smoking TEXT,
+            alcohol TEXT,
+            exercise TEXT,
+            sleep_quality TEXT,
+            stress_level TEXT,
+            caffeine_intake TEXT,
+
+            -- Ayurvedic Assessment
+            body_frame TEXT,
+            skin_type TEXT,
+            hair_type TEXT,
+            appetite TEXT,
+            digestion TEXT,
+            bowel_movements TEXT,
+            sleep_pattern TEXT,
+            mental_state TEXT,
+
+            -- Results
+            diagnosed_dosha TEXT,
+            dosha_confidence REAL,
+            assessment_notes TEXT,
+
+            FOREIGN KEY (patient_id) REFERENCES users (id),
+            FOREIGN KEY (doctor_id) REFERENCES users (id)
+        )
+        ''',
+        # Diet plans database
+        '''
+        CREATE TABLE IF NOT EXISTS diet_plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            patient_id INTEGER NOT NULL,
+            doctor_id INTEGER NOT NULL,
+            assessment_id INTEGER NOT NULL,
+            plan_type TEXT NOT NULL, -- 'weekly' or 'monthly'
+            created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+            start_date DATE,
+            end_date DATE,
+            plan_data TEXT, -- JSON string
+            nutritional_targets TEXT, -- JSON string
+            is_active BOOLEAN DEFAULT TRUE,
+
+            FOREIGN KEY (patient_id) REFERENCES users (id),
+            FOREIGN KEY (doctor_id) REFERENCES users (id),
+            FOREIGN KEY (assessment_id) REFERENCES patient_assessments (id)
+        )
+        '''
+    ]),
+    (2, 'secondary indexes', [
+        'CREATE INDEX IF NOT EXISTS idx_assessments_patient_date ON patient_assessments (patient_id, assessment_date)',
+        'CREATE INDEX IF NOT EXISTS idx_assessments_doctor_date ON patient_assessments (doctor_id, assessment_date)',
+        'CREATE INDEX IF NOT EXISTS idx_diet_plans_patient_active ON diet_plans (patient_id, is_active)',
+        'CREATE INDEX IF NOT EXISTS idx_diet_plans_assessment ON diet_plans (assessment_id)'
+    ]),
+    (3, 'per-day rows for long-horizon diet plans', [
+        '''
+        CREATE TABLE IF NOT EXISTS diet_plan_days (
+            plan_id INTEGER NOT NULL,
+            day_index INTEGER NOT NULL,
+            plan_date DATE NOT NULL,
+            meals TEXT NOT NULL, -- JSON string
+
+            PRIMARY KEY (plan_id, day_index),
+            FOREIGN KEY (plan_id) REFERENCES diet_plans (id)
+        ) WITHOUT ROWID
+        '''
+    ]),
+    # Stored plans reference string ids, so an id must never be handed out twice
+    (4, 'interned strings for binary plan encoding', [
+        '''
+        CREATE TABLE IF NOT EXISTS plan_strings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            value TEXT UNIQUE NOT NULL
+        )
+        '''
+    ])
+]
+
+def migrate_database(connection: sqlite3.Connection, migrations: List) -> int:
+    '''
+    Apply pending migrations to a database and return its schema version
+    '''
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    applied = False
+    for target_version, description, statements in migrations:
+        if target_version <= version:
+            continue
+
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent
+        # processes re-check the version instead of applying a step twice
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            version = connection.execute('PRAGMA user_version').fetchone()[0]
+            if target_version > version:
+                for statement in statements:
+                    connection.execute(statement)
+                connection.execute(f'PRAGMA user_version = {int(target_version)}')
+                version = target_version
+                applied = True
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+
+    if applied:
+        # Refresh planner statistics once, so new indexes are used immediately
+        connection.execute('ANALYZE')
+        connection.commit()
+
+    return version
+
+# ========================================
+# BULK ASSESSMENT INGESTION
+# ========================================
+
+# Input columns of patient_assessments grouped by storage type; bmi is derived
+ASSESSMENT_INTEGER_FIELDS = (
+    'patient_id', 'doctor_id', 'age', 'systolic_bp', 'diastolic_bp', 'heart_rate', 'respiratory_rate'
+)
+ASSESSMENT_REAL_FIELDS = (
+    'height', 'weight', 'temperature', 'oxygen_saturation',
+    'fasting_glucose', 'post_meal_glucose', 'total_cholesterol', 'hdl_cholesterol', 'ldl_cholesterol'
+)
+ASSESSMENT_TEXT_FIELDS = (
+    'gender', 'occupation', 'smoking', 'alcohol', 'exercise', 'sleep_quality', 'stress_level', 'caffeine_intake',
+    'body_frame', 'skin_type', 'hair_type', 'appetite', 'digestion', 'bowel_movements', 'sleep_pattern', 'mental_state'
+)
+ASSESSMENT_REQUIRED_FIELDS = ('patient_id', 'doctor_id')
+
+# Rejected rows beyond this many are counted in 'failed' but not listed in 'errors'
+ASSESSMENT_MAX_REPORTED_ERRORS = 1000
+
+# Column order used by the bulk INSERT
+ASSESSMENT_INSERT_COLUMNS = (
+    'patient_id', 'doctor_id', 'age', 'gender', 'height', 'weight', 'bmi', 'occupation',
+    'systolic_bp', 'diastolic_bp', 'heart_rate', 'temperature', 'respiratory_rate', 'oxygen_saturation',
+    'fasting_glucose', 'post_meal_glucose', 'total_cholesterol', 'hdl_cholesterol', 'ldl_cholesterol',
+    'smoking', 'alcohol', 'exercise', 'sleep_quality', 'stress_level', 'caffeine_intake',
+    'body_frame', 'skin_type', 'hair_type', 'appetite', 'digestion', 'bowel_movements', 'sleep_pattern', 'mental_state',
+    'assessment_date'
+)
+
+def _parse_assessment_record(record: Dict) -> Dict:
+    '''
+    Coerce one raw CSV/JSONL record to typed assessment fields.
+    Empty strings become None; raises ValueError on invalid values.
+    '''
+    parsed = {}
+    for field in ASSESSMENT_INTEGER_FIELDS:
+        value = record.get(field)
+        if value is None or value == '':
+            parsed[field] = None
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be an integer, got {value!r}")
+        if not number.is_integer():
+            raise ValueError(f"{field} must be an integer, got {value!r}")
+        parsed[field] = int(number)
+
+    for field in ASSESSMENT_REAL_FIELDS:
+        value = record.get(field)
+        if value is None or value == '':
+            parsed[field] = None
+        else:
+            try:
+                parsed[field] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} must be a number, got {value!r}")
+
+    for field in ASSESSMENT_TEXT_FIELDS:
+        value = record.get(field)
+        parsed[field] = None if value is None or value == '' else str(value)
+
+    for field in ASSESSMENT_REQUIRED_FIELDS:
+        if parsed[field] is None:
+            raise ValueError(f"{field} is required")
+
+    # Stored as 'YYYY-MM-DD HH:MM:SS' (UTC when an offset is given), like CURRENT_TIMESTAMP
+    value = record.get('assessment_date')
+    if value is None or value == '':
+        parsed['assessment_date'] = None
+    else:
+        try:
+            timestamp = datetime.fromisoformat(str(value))
+        except ValueError:
+            raise ValueError(f"assessment_date must be an ISO date or datetime, got {value!r}")
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        parsed['assessment_date'] = timestamp.isoformat(' ')
+    return parsed
+
+def read_assessment_records(path: str, file_format: str = None):
+    '''
+    Stream raw assessment records from a CSV or JSONL file as
+    (line_number, record) pairs; malformed JSON lines yield the exception
+    '''
+    if file_format is None:
+        file_format = 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if file_format == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                # line_num counts physical lines, including the header
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, e
+
+# Assessment fields used by professional reports, selected by name from alias a
+REPORT_ASSESSMENT_COLUMNS = '''
+    a.id AS assessment_id, a.patient_id, a.doctor_id, a.assessment_date, a.age, a.gender, a.bmi,
+    a.systolic_bp, a.diastolic_bp, a.heart_rate, a.diagnosed_dosha
+'''
+
+# Patient progress series: metrics and SQL expressions mapping a reading to its bucket start date
+PROGRESS_METRICS = ('weight', 'systolic_bp', 'diastolic_bp', 'heart_rate')
+PROGRESS_BUCKETS = {
+    'day': "date(assessment_date)",
+    'week': "date(assessment_date, 'weekday 0', '-6 days')",
+    'month': "strftime('%Y-%m-01', assessment_date)",
+    'quarter': "strftime('%Y-', assessment_date) || printf('%02d', (CAST(strftime('%m', assessment_date) AS INTEGER) - 1) / 3 * 3 + 1) || '-01'",
+    'year': "strftime('%Y-01-01', assessment_date)"
+}
+PROGRESS_BUCKET_DAYS = {'day': 1, 'week': 7, 'month': 31, 'quarter': 92, 'year': 366}
+
+def _rolling_mean(values: List, window: int) -> List:
+    '''
+    Trailing mean over up to `window` points, skipping missing readings
+    '''
+    data = _as_float_column(values) if values else np.zeros(0)
+    present = ~np.isnan(data)
+    sums = np.concatenate([[0.0], np.cumsum(np.where(present, data, 0.0))])
+    counts = np.concatenate([[0], np.cumsum(present)])
+    ends = np.arange(1, len(data) + 1)
+    starts = np.maximum(ends - window, 0)
+    window_counts = counts[ends] - counts[starts]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = (sums[ends] - sums[starts]) / window_counts
+    return [float(value) if count else None for value, count in zip(means, window_counts)]
+
+def _weekly_trend(dates: List, values: List) -> Optional[float]:
+    '''
+    Least-squares slope of a series in units per week, None with fewer than two readings
+    '''
+    points = [(datetime.fromisoformat(str(day)[:19]).timestamp(), value)
+              for day, value in zip(dates, values) if value is not None]
+    if len(points) < 2:
+        return None
+    x, y = np.array(points, dtype=float).T
+    if np.ptp(x) == 0:
+        return None
+    slope_per_second = np.polyfit(x - x[0], y, 1)[0]
+    return float(slope_per_second * 7 * 24 * 3600)
+
+# ========================================
+# DOSHA CLASSIFIER
+# ========================================
+
+# Assessment columns fed to the trained classifier; categoricals are label
+# encoded, numerics are median-imputed and standardized
+DOSHA_MODEL_NUMERIC_FEATURES = (
+    'age', 'height', 'weight', 'bmi', 'systolic_bp', 'diastolic_bp', 'heart_rate',
+    'temperature', 'respiratory_rate', 'oxygen_saturation', 'fasting_glucose',
+    'post_meal_glucose', 'total_cholesterol', 'hdl_cholesterol', 'ldl_cholesterol'
+)
+DOSHA_MODEL_CATEGORICAL_FEATURES = (
+    'gender', 'smoking', 'alcohol', 'exercise', 'sleep_quality', 'stress_level',
+    'caffeine_intake', 'body_frame', 'skin_type', 'hair_type', 'appetite', 'digestion',
+    'bowel_movements', 'sleep_pattern', 'mental_state'
+)
+DOSHA_MODEL_PARAM_GRID = {
+    'n_estimators': [100, 200],
+    'max_depth': [None, 12],
+    'min_samples_leaf': [1, 5]
+}
+# Category every encoder reserves for values not seen during training
+DOSHA_MODEL_UNKNOWN = '__unknown__'
+
+# ========================================
+# MICRO-BATCHING INFERENCE
+# ========================================
+
+class DoshaInferenceBatcher:
+    '''
+    Collects concurrent single-assessment predictions into micro-batches
+    of at most max_batch_size, waiting no longer than max_wait_ms after the
+    first request, and runs one vectorized predict_batch call per batch on
+    a background thread. Each caller gets a Future for its own row.
+    '''
+
+    _STOP = object()
+
+    def __init__(self, predict_batch, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 latency_window: int = 10000):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = Counter()
+        self._requests = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._serve, name='dosha-inference', daemon=True)
+        self._thread.start()
+
+    def submit(self, assessment: Dict) -> Future:
+        '''
+        Queue one assessment and return a Future resolving to its prediction
+        '''
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('Inference batcher has been shut down')
+            self._queue.put((assessment, future, time.perf_counter()))
+        return future
+
+    def predict(self, assessment: Dict, timeout: float = None) -> Dict:
+        return self.submit(assessment).result(timeout)
+
+    def _collect(self, first) -> List:
+        '''
+        Gather requests behind `first` until the batch is full or the wait expires
+        '''
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                self._queue.put(item)
+                break
+            batch.append(item)
+        return batch
+
+    def _serve(self):
+        while True:
+            first = self._queue.get()
+            if first is self._STOP:
+                break
+            batch = self._collect(first)
+            self._run_batch(batch)
+        self._fail_pending()
+
+    def _fail_pending(self):
+        '''
+        Fail any request still queued once the worker has stopped
+        '''
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not self._STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError('Inference batcher has been shut down'))
+
+    def _run_batch(self, batch: List):
+        '''
+        Predict a whole batch at once and resolve every caller's future
+        '''
+        # Cancelled requests are dropped; the rest can no longer be cancelled
+        live = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if len(live) < len(batch):
+            with self._lock:
+                self._cancelled += len(batch) - len(live)
+        if not live:
+            return
+        batch = live
+
+        try:
+            assessments = [assessment for assessment, _, _ in batch]
+            fields = {field for assessment in assessments for field in assessment}
+            columns = {field: [assessment.get(field) for assessment in assessments] for field in fields}
+            result = self.predict_batch(columns)
+            confidence = result['confidence_scores'].tolist()
+            predictions = [{
+                'primary_dosha': result['primary_dosha'][row],
+                'confidence_scores': dict(zip(result['dosha_types'], confidence[row])),
+                'dual_dosha': bool(result['dual_dosha'][row])
+            } for row in range(len(batch))]
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            with self._lock:
+                self._failed += len(batch)
+                self._batch_sizes[len(batch)] += 1
+            return
+
+        resolved_at = []
+        for (_, future, _), prediction in zip(batch, predictions):
+            future.set_result(prediction)
+            resolved_at.append(time.perf_counter())
+
+        with self._lock:
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] += 1
+            self._latencies.extend(done - queued for (_, _, queued), done in zip(batch, resolved_at))
+
+    def get_metrics(self) -> Dict:
+        '''
+        Request latency percentiles (queueing included) and the batch-size histogram
+        '''
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            histogram = dict(sorted(self._batch_sizes.items()))
+            requests, failed, cancelled = self._requests, self._failed, self._cancelled
+        batches = sum(histogram.values())
+        return {
+            'requests': requests,
+            'failed': failed,
+            'cancelled': cancelled,
+            'batches': batches,
+            'avg_batch_size': (requests + failed) / batches if batches else 0.0,
+            'batch_size_histogram': histogram,
+            'p50_latency_ms': float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+            'p99_latency_ms': float(np.percentile(latencies, 99)) if len(latencies) else 0.0,
+            'queued': self._queue.qsize()
+        }
+
+    def shutdown(self):
+        '''
+        Finish queued requests, then stop the worker thread; submit raises afterwards
+        '''
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(self._STOP)
+        self._thread.join()
+
+# ========================================
+# MODEL REGISTRY
+# ========================================
+
+def _resident_memory_bytes() -> int:
+    '''
+    Current resident set size of this process (peak RSS where /proc is unavailable)
+    '''
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+def _write_text_atomic(path: str, text: str):
+    '''
+    Replace a file's contents atomically through a temp file unique to this
+    writer, so concurrent writers from several processes never collide
+    '''
+    directory, name = os.path.split(path)
+    descriptor, temporary = tempfile.mkstemp(dir=directory or '.', prefix=f'.{name}.', suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+class DoshaModelRegistry:
+    '''
+    Versioned classifier bundles on local disk: <root>/<version>/model.joblib
+    with a metadata.json beside it and an ACTIVE file naming the serving
+    version. Bundles are stored uncompressed so joblib can memory-map their
+    arrays. RandomForest trees copy their node arrays when unpickled, so the
+    model itself is never shared between processes; mmap_mode='r' only skips
+    the temporary read buffer, which roughly halves the RSS growth of a load
+    (measured about 40 MB against 82 MB for a 42 MB bundle).
+    '''
+
+    MODEL_FILE = 'model.joblib'
+    METADATA_FILE = 'metadata.json'
+    ACTIVE_FILE = 'ACTIVE'
+    VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+    def __init__(self, root: str):
+        self.root = root
+        self.load_stats = {}  # version -> figures from the last load in this process
+        self._lock = threading.Lock()
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _version_numbers(self) -> Dict[str, int]:
+        '''
+        Number of every vN directory, published or not; other entries are ignored
+        '''
+        if not os.path.isdir(self.root):
+            return {}
+        numbers = {}
+        for name in os.listdir(self.root):
+            match = self.VERSION_PATTERN.match(name)
+            if match and os.path.isdir(self._path(name)):
+                numbers[name] = int(match.group(1))
+        return numbers
+
+    def versions(self) -> List[str]:
+        '''
+        Published versions, oldest first
+        '''
+        numbers = self._version_numbers()
+        return sorted((name for name in numbers if os.path.isfile(self._path(name, self.METADATA_FILE))),
+                      key=numbers.get)
+
+    def publish(self, bundle: Dict, notes: str = '') -> str:
+        '''
+        Write a bundle as the next version and return its name
+        '''
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            # Incomplete versions count too, so their directories are never reused
+            version = f'v{max(self._version_numbers().values(), default=0) + 1:04d}'
+            directory = self._path(version)
+            os.makedirs(directory)
+            model_path = os.path.join(directory, self.MODEL_FILE)
+            _lazy_import('joblib').dump(bundle, model_path)
+            # metadata.json is written last: a version without it is incomplete
+            _write_text_atomic(os.path.join(directory, self.METADATA_FILE), json.dumps({
+                'version': version,
+                'published_at': datetime.now().isoformat(),
+                'size_bytes': os.path.getsize(model_path),
+                'feature_names': bundle.get('feature_names', []),
+                'notes': notes
+            }, indent=2))
+        return version
+
+    def metadata(self, version: str) -> Dict:
+        with open(self._path(version, self.METADATA_FILE)) as f:
+            return json.load(f)
+
+    def active_version(self) -> Optional[str]:
+        '''
+        Version named by ACTIVE, else the newest published one
+        '''
+        try:
+            with open(self._path(self.ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            versions = self.versions()
+            return versions[-1] if versions else None
+
+    def set_active(self, version: str):
+        if not os.path.isfile(self._path(version, self.METADATA_FILE)):
+            raise FileNotFoundError(version)
+        _write_text_atomic(self._path(self.ACTIVE_FILE), version)
+
+    def load(self, version: str, mmap_mode: Optional[str] = 'r') -> tuple:
+        '''
+        Load a version and return (bundle, stats) with load time and the
+        resident-memory growth it caused
+        '''
+        if not os.path.isfile(self._path(version, self.METADATA_FILE)):
+            raise FileNotFoundError(version)
+        rss_before = _resident_memory_bytes()
+        start = time.perf_counter()
+        bundle = _lazy_import('joblib').load(self._path(version, self.MODEL_FILE), mmap_mode=mmap_mode)
+        stats = {
+            'load_seconds': time.perf_counter() - start,
+            'rss_delta_bytes': _resident_memory_bytes() - rss_before,
+            'rss_bytes': _resident_memory_bytes(),
+            'mmap_mode': mmap_mode
+        }
+        with self._lock:
+            self.load_stats[version] = stats
+        return bundle, stats
+
+    def get_stats(self) -> Dict:
+        '''
+        Per-version metadata merged with load figures measured in this process
+        '''
+        with self._lock:
+            load_stats = dict(self.load_stats)
+        active = self.active_version()
+        return {
+            version: {**self.metadata(version), **load_stats.get(version, {}), 'active': version == active}
+            for version in self.versions()
+        }
+
 class EnhancedAyurvedicHealthcareSystem:
-    def __init__(self):
+    def __init__(self, lazy: bool = False, users_db: str = 'users.db', patients_db: str = 'patients.db',
+                 auth_workers: int = 0, auth_max_pending: int = None,
+                 report_cache_size: int = 1024, report_cache_ttl: float = 300.0,
+                 plan_cache_size: int = 256, plan_storage_format: str = 'binary',
+                 model_dir: str = 'models'):
+        '''
+        With lazy=True the database connections, food/recipe catalogs and
+        the feature scaler are created on first use instead of here.
+        auth_workers > 0 moves password hashing to a process pool of that size.
+        model_dir holds the versioned dosha classifier registry.
+        '''
+        self.users_db = users_db
+        self.patients_db = patients_db
         self.dosha_classifier = None
         self.label_encoders = {}
-        self.scaler = StandardScaler()
         self.feature_names = []
-        self.food_database = {}
-        self.recipe_database = {}
+        self.feature_fill_values = {}
+        # Set by start_inference_batcher; routes diagnoses through the trained model
+        self.inference_batcher = None
+        self._model_lock = threading.RLock()
+        self.model_dir = model_dir
+        self._model_registry = None
         self.user_sessions = {}
+        self._scaler = None
+        self.users_pool = None
+        self.patients_pool = None
+        self._init_lock = threading.Lock()
+        self.schema_versions = {}
+        self.password_hasher = PasswordHashingPool(auth_workers, auth_max_pending) if auth_workers else None
+        self.session_cache = SessionTokenCache()
+        self.report_cache = ReportCache(report_cache_size, report_cache_ttl)
+        self.plan_memo = PlanMemo(plan_cache_size)
+        # 'binary' (interned, compressed blobs) or 'json' for stored diet plans
+        self.plan_storage_format = plan_storage_format
+        self.plan_strings = PlanStringTable(patients_db)
+        self._food_database = None
+        self._food_catalog = None
+        self._recipe_database = None
+        self._diet_optimizer = None
+        self._shopping_engine = None
+        self._recipe_index = None
 
-        # Initialize databases
-        self.init_databases()
-        self.load_food_database()
-        self.load_recipe_database()
+        if not lazy:
+            # Initialize databases
+            self.init_databases()
+            self.load_food_database()
+            self.load_recipe_database()
+            self._scaler = _lazy_import('StandardScaler')()
 
-    def init_databases(self):
+    @property
+    def conn_users(self) -> sqlite3.Connection:
         '''
-        Initialize SQLite databases for user management and patient data
+        The calling thread's connection to the users database
         '''
-        # User management database
-        self.conn_users = sqlite3.connect('users.db', check_same_thread=False)
-        self.conn_users.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL,
-                name TEXT NOT NULL,
-                phone TEXT,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT TRUE
-            )
-        ''')
+        if self.users_pool is None:
+            self.init_databases()
+        return self.users_pool.connection()
 
-        # Admin specific fields
-        self.conn_users.execute('''
-            CREATE TABLE IF NOT EXISTS admin_profiles (
-                user_id INTEGER PRIMARY KEY,
-                govt_employee_id TEXT UNIQUE,
-                job_location TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-
-        # Doctor specific fields  
-        self.conn_users.execute('''
-            CREATE TABLE IF NOT EXISTS doctor_profiles (
-                user_id INTEGER PRIMARY KEY,
-                license_number TEXT UNIQUE NOT NULL,
-                govt_id TEXT,
-                hospital_location TEXT,
-                practice_years INTEGER,
-                specialization TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+    @property
+    def conn_patients(self) -> sqlite3.Connection:
+        '''
+        The calling thread's connection to the patients database
+        '''
+        if self.patients_pool is None:
+            self.init_databases()
+        return self.patients_pool.connection()
 
-        # Patient specific fields
-        self.conn_users.execute('''
-            CREATE TABLE IF NOT EXISTS patient_profiles (
-                user_id INTEGER PRIMARY KEY,
-                emergency_contact TEXT,
-                assigned_doctor_id INTEGER,
-                FOREIGN KEY (user_id) REFERENCES users (id),
-                FOREIGN KEY (assigned_doctor_id) REFERENCES users (id)
-            )
-        ''')
+    def close(self):
+        '''
+        Close all pooled database connections
+        '''
+        for pool in (self.users_pool, self.patients_pool):
+            if pool is not None:
+                pool.close_all()
+        self.plan_strings.close()
+        if self.password_hasher is not None:
+            self.password_hasher.shutdown()
+        self.stop_inference_batcher()
 
-        # Patient assessments database
-        self.conn_patients = sqlite3.connect('patients.db', check_same_thread=False)
-        self.conn_patients.execute('''
-            CREATE TABLE IF NOT EXISTS patient_assessments (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER NOT NULL,
-                doctor_id INTEGER NOT NULL,
-                assessment_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-
-                -- Demographics
-                age INTEGER,
-                gender TEXT,
-                height REAL,
-                weight REAL,
-                bmi REAL,
-                occupation TEXT,
-
-                -- Vital Signs
-                systolic_bp INTEGER,
-                diastolic_bp INTEGER,
-                heart_rate INTEGER,
-                temperature REAL,
-                respiratory_rate INTEGER,
-                oxygen_saturation REAL,
-
-                -- Blood Parameters
-                fasting_glucose REAL,
-                post_meal_glucose REAL,
-                total_cholesterol REAL,
-                hdl_cholesterol REAL,
-                ldl_cholesterol REAL,
-
-                -- Lifestyle
-                smoking TEXT,
-                alcohol TEXT,
-                exercise TEXT,
-                sleep_quality TEXT,
-                stress_level TEXT,
-                caffeine_intake TEXT,
-
-                -- Ayurvedic Assessment
-                body_frame TEXT,
-                skin_type TEXT,
-                hair_type TEXT,
-                appetite TEXT,
-                digestion TEXT,
-                bowel_movements TEXT,
-                sleep_pattern TEXT,
-                mental_state TEXT,
-
-                -- Results
-                diagnosed_dosha TEXT,
-                dosha_confidence REAL,
-                assessment_notes TEXT,
-
-                FOREIGN KEY (patient_id) REFERENCES users (id),
-                FOREIGN KEY (doctor_id) REFERENCES users (id)
-            )
-        ''')
+    def hash_password(self, password: str) -> str:
+        '''
+        Hash a password, on the hashing pool when authentication service mode is on
+        '''
+        if self.password_hasher is not None:
+            return self.password_hasher.hash_password(password)
+        return generate_password_hash(password)
 
-        # Diet plans database
-        self.conn_patients.execute('''
-            CREATE TABLE IF NOT EXISTS diet_plans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                patient_id INTEGER NOT NULL,
-                doctor_id INTEGER NOT NULL,
-                assessment_id INTEGER NOT NULL,
-                plan_type TEXT NOT NULL, -- 'weekly' or 'monthly'
-                created_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-                start_date DATE,
-                end_date DATE,
-                plan_data TEXT, -- JSON string
-                nutritional_targets TEXT, -- JSON string
-                is_active BOOLEAN DEFAULT TRUE,
-
-                FOREIGN KEY (patient_id) REFERENCES users (id),
-                FOREIGN KEY (doctor_id) REFERENCES users (id),
-                FOREIGN KEY (assessment_id) REFERENCES patient_assessments (id)
-            )
-        ''')
+    def check_password(self, password_hash: str, password: str) -> bool:
+        '''
+        Verify a password, on the hashing pool when authentication service mode is on
+        '''
+        if self.password_hasher is not None:
+            return self.password_hasher.check_password(password_hash, password)
+        return check_password_hash(password_hash, password)
+
+    @property
+    def food_database(self) -> Dict:
+        if self._food_database is None:
+            self.load_food_database()
+        return self._food_database
+
+    @food_database.setter
+    def food_database(self, catalog: Dict):
+        self._food_database = catalog
+        self._food_catalog = None
+        self.plan_memo.clear()
+
+    @property
+    def food_catalog(self) -> FoodCatalog:
+        '''
+        Columnar nutrient catalog built from food_database on first use
+        '''
+        if self._food_catalog is None:
+            self._food_catalog = FoodCatalog(self.food_database)
+        return self._food_catalog
+
+    def refresh_food_catalog(self):
+        '''
+        Rebuild the columnar catalog after food_database was edited in place
+        '''
+        self._food_catalog = None
+        self.plan_memo.clear()
+
+    @property
+    def recipe_database(self) -> Dict:
+        if self._recipe_database is None:
+            self.load_recipe_database()
+        return self._recipe_database
+
+    @recipe_database.setter
+    def recipe_database(self, catalog: Dict):
+        self._recipe_database = catalog
+        self._recipe_index = None
+        self.plan_memo.clear()
+
+    @property
+    def recipe_index(self) -> RecipeIndex:
+        '''
+        Inverted recipe index built from recipe_database on first use
+        '''
+        if self._recipe_index is None:
+            self._recipe_index = RecipeIndex(self.recipe_database)
+        return self._recipe_index
+
+    def add_recipe(self, key: str, recipe: Dict):
+        '''
+        Add or replace a recipe, updating the index incrementally
+        '''
+        self.recipe_database[key] = recipe
+        if self._recipe_index is not None:
+            self._recipe_index.add(key, recipe)
+        # Compiled recipe matrices and memoized plans depend on the recipe set
+        self._diet_optimizer = None
+        self._shopping_engine = None
+        self.plan_memo.clear()
+
+    def search_recipes(self, **filters) -> List[str]:
+        '''
+        Recipe keys matching RecipeIndex.search filters
+        '''
+        return self.recipe_index.search(**filters)
+
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            self._scaler = _lazy_import('StandardScaler')()
+        return self._scaler
+
+    @scaler.setter
+    def scaler(self, scaler):
+        self._scaler = scaler
+
+    def init_databases(self):
+        '''
+        Initialize SQLite databases for user management and patient data
+        '''
+        with self._init_lock:
+            if self.users_pool is not None and self.patients_pool is not None:
+                return
+
+            # Connections are handed out per thread by the pools. They are only
+            # published once migrated, so no thread sees an outdated schema.
+            users_pool = SQLiteConnectionPool(self.users_db)
+            patients_pool = SQLiteConnectionPool(self.patients_db)
+            try:
+                schema_versions = {
+                    'users': migrate_database(users_pool.connection(), USERS_DB_MIGRATIONS),
+                    'patients': migrate_database(patients_pool.connection(), PATIENTS_DB_MIGRATIONS)
+                }
+            except BaseException:
+                users_pool.close_all()
+                patients_pool.close_all()
+                raise
 
-        self.conn_users.commit()
-        self.conn_patients.commit()
+            self.schema_versions = schema_versions
+            self.users_pool = users_pool
+            self.patients_pool = patients_pool
 
     def register_user(self, user_data: Dict, role: str) -> Dict:
         '''
@@ -178,7 +2343,7 @@ class EnhancedAyurvedicHealthcareSystem:
         '''
         try:
             # Hash password
-            password_hash = generate_password_hash(user_data['password'])
+            password_hash = self.hash_password(user_data['password'])
 
             # Insert into users table
             cursor = self.conn_users.cursor()
@@ -253,7 +2418,7 @@ class EnhancedAyurvedicHealthcareSystem:
 
             user = cursor.fetchone()
 
-            if user and check_password_hash(user[1], password):
+            if user and self.check_password(user[1], password):
                 # Generate session token (simplified JWT simulation)
                 session_token = self.generate_session_token(user[0], user[2])
 
@@ -282,10 +2447,55 @@ class EnhancedAyurvedicHealthcareSystem:
             'role': role,
             'exp': datetime.utcnow() + timedelta(hours=24)
         }
-        # In production, use a proper secret key
-        token = jwt.encode(payload, 'secret_key', algorithm='HS256')
+        token = _lazy_import('jwt').encode(payload, SESSION_TOKEN_SECRET, algorithm=SESSION_TOKEN_ALGORITHM)
         return token
 
+    def verify_session_token(self, token: str) -> Dict:
+        '''
+        Verify a session token, serving repeat checks from the session cache
+        '''
+        jwt = _lazy_import('jwt')
+        digest = SessionTokenCache.digest(token)
+
+        if self.session_cache.is_revoked(digest):
+            return {'success': False, 'message': 'Session revoked'}
+
+        payload = self.session_cache.get(digest, time.time())
+        if payload is None:
+            try:
+                payload = jwt.decode(token, SESSION_TOKEN_SECRET, algorithms=[SESSION_TOKEN_ALGORITHM],
+                                     options={'require': SESSION_TOKEN_REQUIRED_CLAIMS})
+            except jwt.ExpiredSignatureError:
+                return {'success': False, 'message': 'Session expired'}
+            except jwt.InvalidTokenError:
+                return {'success': False, 'message': 'Invalid token'}
+            self.session_cache.put(digest, payload, payload['exp'])
+
+        return {
+            'success': True,
+            'user': {
+                'id': payload['user_id'],
+                'role': payload['role']
+            }
+        }
+
+    def revoke_session_token(self, token: str) -> Dict:
+        '''
+        Revoke a session token (e.g. on logout) until it expires
+        '''
+        jwt = _lazy_import('jwt')
+        try:
+            # Signature must be valid; expired tokens need no revocation
+            payload = jwt.decode(token, SESSION_TOKEN_SECRET, algorithms=[SESSION_TOKEN_ALGORITHM],
+                                 options={'require': SESSION_TOKEN_REQUIRED_CLAIMS})
+        except jwt.ExpiredSignatureError:
+            return {'success': True, 'message': 'Session already expired'}
+        except jwt.InvalidTokenError:
+            return {'success': False, 'message': 'Invalid token'}
+
+        self.session_cache.revoke(SessionTokenCache.digest(token), payload['exp'])
+        return {'success': True, 'message': 'Session revoked'}
+
     def create_comprehensive_assessment(self, assessment_data: Dict) -> int:
         '''
         Create a comprehensive patient assessment record
@@ -344,91 +2554,570 @@ class EnhancedAyurvedicHealthcareSystem:
                 assessment_data.get('mental_state')
             ))
 
-            assessment_id = cursor.lastrowid
-            self.conn_patients.commit()
+            assessment_id = cursor.lastrowid
+            self.conn_patients.commit()
+            self.report_cache.invalidate_users([assessment_data['patient_id']])
+
+            return assessment_id
+
+        except Exception as e:
+            print(f"Error creating assessment: {e}")
+            return None
+
+    def bulk_create_assessments(self, records, chunk_size: int = 5000,
+                                max_errors: int = ASSESSMENT_MAX_REPORTED_ERRORS) -> Dict:
+        '''
+        Insert many assessment dicts in chunked transactions. Invalid rows
+        are skipped without aborting the batch; 'failed' counts them and
+        'errors' lists the first max_errors by position.
+        '''
+        return self._ingest_assessments(enumerate(records, start=1), chunk_size, max_errors)
+
+    def ingest_assessment_file(self, path: str, file_format: str = None, chunk_size: int = 5000,
+                               max_errors: int = ASSESSMENT_MAX_REPORTED_ERRORS) -> Dict:
+        '''
+        Stream assessments from a CSV or JSONL file into patient_assessments.
+        The first max_errors errors are reported by line number.
+        '''
+        return self._ingest_assessments(read_assessment_records(path, file_format), chunk_size, max_errors)
+
+    def _ingest_assessments(self, numbered_records, chunk_size: int, max_errors: int) -> Dict:
+        '''
+        Validate, derive BMI and insert (position, record) pairs chunk by chunk
+        '''
+        start = time.perf_counter()
+        stats = {'inserted': 0, 'failed': 0, 'errors': []}
+
+        chunk = []
+        for position, record in numbered_records:
+            chunk.append((position, record))
+            if len(chunk) >= chunk_size:
+                self._insert_assessment_chunk(chunk, stats, max_errors)
+                chunk = []
+        if chunk:
+            self._insert_assessment_chunk(chunk, stats, max_errors)
+
+        elapsed = time.perf_counter() - start
+        stats['elapsed_seconds'] = elapsed
+        stats['rows_per_second'] = stats['inserted'] / elapsed if elapsed > 0 else 0.0
+        return stats
+
+    @staticmethod
+    def _reject_assessment(stats: Dict, position, error: str, max_errors: int):
+        stats['failed'] += 1
+        if len(stats['errors']) < max_errors:
+            stats['errors'].append({'row': position, 'error': error})
+
+    def _insert_assessment_chunk(self, chunk: List, stats: Dict, max_errors: int):
+        '''
+        Insert one chunk of raw records in a single transaction, or in a
+        savepoint when the connection is already inside one
+        '''
+        positions = []
+        rows = []
+        for position, record in chunk:
+            try:
+                if isinstance(record, Exception):
+                    raise record
+                if not isinstance(record, dict):
+                    raise ValueError('record must be an object')
+                rows.append(_parse_assessment_record(record))
+                positions.append(position)
+            except Exception as e:
+                self._reject_assessment(stats, position, str(e), max_errors)
+
+        if not rows:
+            return
+
+        # Vectorized BMI, same arithmetic and missing-value rule as
+        # create_comprehensive_assessment (height and weight both truthy)
+        height = _as_float_column([row['height'] for row in rows])
+        weight = _as_float_column([row['weight'] for row in rows])
+        has_bmi = (np.nan_to_num(height) != 0) & (np.nan_to_num(weight) != 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            height_m = height / 100
+            bmi = weight / (height_m ** 2)
+        for row, value, valid in zip(rows, bmi.tolist(), has_bmi.tolist()):
+            row['bmi'] = value if valid else None
+
+        placeholders = ', '.join(['?'] * (len(ASSESSMENT_INSERT_COLUMNS) - 1))
+        sql = f'''
+            INSERT INTO patient_assessments ({', '.join(ASSESSMENT_INSERT_COLUMNS)})
+            VALUES ({placeholders}, COALESCE(?, CURRENT_TIMESTAMP))
+        '''
+        params = [tuple(row[column] for column in ASSESSMENT_INSERT_COLUMNS) for row in rows]
+
+        connection = self.conn_patients
+        # Rows join a transaction the caller already opened; the caller commits it
+        nested = connection.in_transaction
+
+        def begin():
+            connection.execute('SAVEPOINT assessment_chunk' if nested else 'BEGIN')
+
+        def commit():
+            if nested:
+                connection.execute('RELEASE assessment_chunk')
+            else:
+                connection.commit()
+
+        def rollback():
+            if nested:
+                connection.execute('ROLLBACK TO assessment_chunk')
+                connection.execute('RELEASE assessment_chunk')
+            else:
+                connection.rollback()
+
+        try:
+            begin()
+            connection.executemany(sql, params)
+            commit()
+            stats['inserted'] += len(params)
+        except sqlite3.DatabaseError:
+            rollback()
+            # Fall back to row-by-row inside one transaction to isolate the bad rows
+            begin()
+            for position, row_params in zip(positions, params):
+                try:
+                    connection.execute(sql, row_params)
+                    stats['inserted'] += 1
+                except sqlite3.DatabaseError as e:
+                    self._reject_assessment(stats, position, str(e), max_errors)
+            commit()
+
+        self.report_cache.invalidate_users({row['patient_id'] for row in rows})
+
+    def diagnose_dosha_comprehensive(self, assessment_data: Dict) -> Dict:
+        '''
+        Comprehensive dosha diagnosis using ML model
+        '''
+        if self.inference_batcher is not None:
+            # Trained model, micro-batched with concurrent callers
+            prediction = self.inference_batcher.predict(assessment_data)
+            dominant_dosha = prediction['primary_dosha']
+            confidence_scores = prediction['confidence_scores']
+            return {
+                'primary_dosha': dominant_dosha,
+                'confidence_scores': confidence_scores,
+                'detailed_analysis': self.generate_dosha_analysis(dominant_dosha, confidence_scores)
+            }
+
+        # Enhanced dosha diagnosis algorithm
+        scores = dict.fromkeys(DOSHA_TYPES, 0)
+
+        def add(weights):
+            for dosha, weight in zip(DOSHA_TYPES, weights):
+                scores[dosha] += weight
+
+        # Physical, digestive, mental and sleep characteristics
+        for field, rules in DOSHA_CATEGORICAL_WEIGHTS.items():
+            weights = rules.get(assessment_data.get(field))
+            if weights:
+                add(weights)
+
+        # Heart rate based classification (research-backed)
+        heart_rate = assessment_data.get('heart_rate')
+        if heart_rate:
+            for lower_bound, weights in DOSHA_HEART_RATE_BANDS:
+                if heart_rate >= lower_bound:
+                    add(weights)
+                    break
+
+        # Blood pressure considerations
+        systolic_bp = assessment_data.get('systolic_bp')
+        if systolic_bp:
+            if systolic_bp > DOSHA_HYPERTENSION_SYSTOLIC:
+                add(DOSHA_HYPERTENSION_WEIGHTS)
+
+        # Determine dominant dosha
+        total_score = sum(scores.values())
+        if total_score > 0:
+            confidence_scores = {k: v/total_score for k, v in scores.items()}
+            dominant_dosha = max(scores, key=scores.get)
+        else:
+            confidence_scores = dict(zip(DOSHA_TYPES, DOSHA_DEFAULT_CONFIDENCE))
+            dominant_dosha = DOSHA_TYPES[0]  # Default
+
+        return {
+            'primary_dosha': dominant_dosha,
+            'confidence_scores': confidence_scores,
+            'detailed_analysis': self.generate_dosha_analysis(dominant_dosha, confidence_scores)
+        }
+
+    def diagnose_dosha_batch(self, assessments) -> Dict:
+        '''
+        Vectorized dosha diagnosis over a DataFrame or a mapping of column arrays.
+        Applies the same rules as diagnose_dosha_comprehensive and returns
+        per-row primary dosha, an (n, 3) confidence matrix ordered as
+        DOSHA_TYPES and the dual-dosha flag.
+        '''
+        n = _column_length(assessments)
+        scores = np.zeros((n, len(DOSHA_TYPES)))
+
+        # Categorical fields: map each distinct value to its weight row once,
+        # then gather the rows for every assessment
+        for field, rules in DOSHA_CATEGORICAL_WEIGHTS.items():
+            if field not in assessments:
+                continue
+            values = np.asarray(assessments[field], dtype=object).astype(str)
+            uniques, inverse = np.unique(values, return_inverse=True)
+            lookup = np.array([rules.get(value, (0, 0, 0)) for value in uniques], dtype=float)
+            scores += lookup.reshape(-1, len(DOSHA_TYPES))[inverse.reshape(-1)]
+
+        if 'heart_rate' in assessments:
+            heart_rate = _as_float_column(assessments['heart_rate'])
+            unmatched = np.ones(n, dtype=bool)
+            for lower_bound, weights in DOSHA_HEART_RATE_BANDS:
+                in_band = unmatched & (heart_rate >= lower_bound)
+                scores += np.outer(in_band, weights)
+                unmatched &= ~in_band
+
+        if 'systolic_bp' in assessments:
+            systolic_bp = _as_float_column(assessments['systolic_bp'])
+            hypertensive = systolic_bp > DOSHA_HYPERTENSION_SYSTOLIC
+            scores += np.outer(hypertensive, DOSHA_HYPERTENSION_WEIGHTS)
+
+        total = scores.sum(axis=1)
+        scored = total > 0
+        confidence = np.empty_like(scores)
+        confidence[scored] = scores[scored] / total[scored, None]
+        confidence[~scored] = DOSHA_DEFAULT_CONFIDENCE
+
+        # argmax returns the first maximum, matching max() over DOSHA_TYPES order
+        primary_index = np.where(scored, scores.argmax(axis=1), 0)
+        top_two = np.sort(confidence, axis=1)[:, -2:]
+        dual_dosha = (top_two[:, 1] - top_two[:, 0]) < DUAL_DOSHA_MARGIN
+
+        return {
+            'dosha_types': DOSHA_TYPES,
+            'primary_dosha': np.array(DOSHA_TYPES, dtype=object)[primary_index],
+            'confidence_scores': confidence,
+            'dual_dosha': dual_dosha
+        }
+
+    def load_dosha_training_data(self, limit: int = None):
+        '''
+        DataFrame of model features and diagnosed_dosha labels from patient_assessments
+        '''
+        columns = DOSHA_MODEL_NUMERIC_FEATURES + DOSHA_MODEL_CATEGORICAL_FEATURES + ('diagnosed_dosha',)
+        query = f"""
+            SELECT {', '.join(columns)} FROM patient_assessments
+            WHERE diagnosed_dosha IS NOT NULL
+            ORDER BY id
+        """
+        params = ()
+        if limit is not None:
+            query += ' LIMIT ?'
+            params = (limit,)
+        return _lazy_import('pd').read_sql(query, self.conn_patients, params=params)
+
+    def _fit_dosha_preprocessing(self, assessments) -> Dict:
+        '''
+        New label encoders, imputation medians and scaler fitted on assessments,
+        keyed as in the model bundle; nothing on self is touched
+        '''
+        n = _column_length(assessments)
+        numeric = np.column_stack([
+            _as_float_column(assessments[field]) if field in assessments else np.full(n, np.nan)
+            for field in DOSHA_MODEL_NUMERIC_FEATURES
+        ])
+        medians = np.nan_to_num(np.nanmedian(numeric, axis=0))
+        scaler = _lazy_import('StandardScaler')()
+        scaler.fit(np.where(np.isnan(numeric), medians, numeric))
+
+        label_encoders = {}
+        for field in DOSHA_MODEL_CATEGORICAL_FEATURES:
+            if field in assessments:
+                values = np.asarray(assessments[field], dtype=object).astype(str)
+            else:
+                values = np.full(n, 'None', dtype=object).astype(str)
+            encoder = _lazy_import('LabelEncoder')()
+            encoder.fit(np.append(values, DOSHA_MODEL_UNKNOWN))
+            label_encoders[field] = encoder
+
+        return {
+            'label_encoders': label_encoders,
+            'feature_fill_values': dict(zip(DOSHA_MODEL_NUMERIC_FEATURES, medians.tolist())),
+            'scaler': scaler,
+            'feature_names': list(DOSHA_MODEL_NUMERIC_FEATURES + DOSHA_MODEL_CATEGORICAL_FEATURES)
+        }
+
+    def build_dosha_feature_matrix(self, assessments, fit: bool = False, preprocessing: Dict = None) -> np.ndarray:
+        '''
+        Feature matrix for a DataFrame or mapping of column arrays, using the
+        given preprocessing or the installed one. fit=True installs newly
+        fitted label_encoders, imputation medians and scaler first.
+        '''
+        if fit:
+            preprocessing = self._fit_dosha_preprocessing(assessments)
+            with self._model_lock:
+                self.label_encoders = preprocessing['label_encoders']
+                self.feature_fill_values = preprocessing['feature_fill_values']
+                self.scaler = preprocessing['scaler']
+                self.feature_names = preprocessing['feature_names']
+        elif preprocessing is None:
+            with self._model_lock:
+                preprocessing = {
+                    'label_encoders': self.label_encoders,
+                    'feature_fill_values': self.feature_fill_values,
+                    'scaler': self.scaler
+                }
+        n = _column_length(assessments)
+
+        numeric = np.column_stack([
+            _as_float_column(assessments[field]) if field in assessments else np.full(n, np.nan)
+            for field in DOSHA_MODEL_NUMERIC_FEATURES
+        ])
+        fill_values = preprocessing['feature_fill_values']
+        fill = np.array([fill_values[field] for field in DOSHA_MODEL_NUMERIC_FEATURES])
+        numeric = preprocessing['scaler'].transform(np.where(np.isnan(numeric), fill, numeric))
+
+        encoded = np.empty((n, len(DOSHA_MODEL_CATEGORICAL_FEATURES)))
+        for column, field in enumerate(DOSHA_MODEL_CATEGORICAL_FEATURES):
+            if field in assessments:
+                values = np.asarray(assessments[field], dtype=object).astype(str)
+            else:
+                values = np.full(n, 'None', dtype=object).astype(str)
+            # Encode each distinct value once; unseen values take the reserved code
+            classes = preprocessing['label_encoders'][field].classes_
+            codes = {value: code for code, value in enumerate(classes)}
+            unknown = codes[DOSHA_MODEL_UNKNOWN]
+            uniques, inverse = np.unique(values, return_inverse=True)
+            lookup = np.array([codes.get(value, unknown) for value in uniques], dtype=float)
+            encoded[:, column] = lookup[inverse.reshape(-1)]
+
+        return np.hstack([numeric, encoded])
+
+    def train_dosha_classifier(self, param_grid: Dict = None, cv: int = 5, n_jobs: int = -1,
+                               model_path: str = None, limit: int = None, test_size: float = 0.2,
+                               random_state: int = 42) -> Dict:
+        '''
+        Grid-search a RandomForest on stored assessments, cross-validate the
+        best estimator and time its inference against the rule-based scorer.
+        Preprocessing is fitted into a fresh bundle, and the model and its
+        preprocessing are installed together only after the search succeeds;
+        the bundle is saved to model_path.
+        '''
+        data = self.load_dosha_training_data(limit)
+        if data.empty:
+            return {'success': False, 'message': 'No diagnosed assessments to train on'}
+
+        start = time.perf_counter()
+        train, test = _lazy_import('train_test_split')(
+            data, test_size=test_size, random_state=random_state,
+            stratify=data['diagnosed_dosha'] if data['diagnosed_dosha'].value_counts().min() > 1 else None
+        )
+        # Serving keeps the installed model and preprocessing until training succeeds
+        preprocessing = self._fit_dosha_preprocessing(train)
+        X_train = self.build_dosha_feature_matrix(train, preprocessing=preprocessing)
+        y_train = train['diagnosed_dosha'].to_numpy()
+
+        search = _lazy_import('GridSearchCV')(
+            _lazy_import('RandomForestClassifier')(random_state=random_state),
+            param_grid or DOSHA_MODEL_PARAM_GRID, cv=cv, n_jobs=n_jobs
+        )
+        search.fit(X_train, y_train)
+        cv_scores = _lazy_import('cross_val_score')(search.best_estimator_, X_train, y_train, cv=cv, n_jobs=n_jobs)
+        training_seconds = time.perf_counter() - start
+
+        X_test = self.build_dosha_feature_matrix(test, preprocessing=preprocessing)
+        holdout_accuracy = _lazy_import('accuracy_score')(
+            test['diagnosed_dosha'].to_numpy(), search.best_estimator_.predict(X_test)
+        )
+        self._install_dosha_model({'model': search.best_estimator_, **preprocessing})
+
+        result = {
+            'success': True,
+            'training_rows': len(train),
+            'holdout_rows': len(test),
+            'best_params': search.best_params_,
+            'cv_accuracy_mean': float(cv_scores.mean()),
+            'cv_accuracy_std': float(cv_scores.std()),
+            'holdout_accuracy': float(holdout_accuracy),
+            'training_seconds': training_seconds,
+            'latency': self._dosha_inference_latency(test)
+        }
+        if model_path:
+            self.save_dosha_classifier(model_path)
+            result['model_path'] = model_path
+        return result
+
+    def _dosha_inference_latency(self, sample, max_rows: int = 1000) -> Dict:
+        '''
+        Per-row inference time in milliseconds for the model (batched and
+        single-row) and the rule-based scorer (per dict and vectorized)
+        '''
+        sample = sample.head(max_rows)
+        records = sample.drop(columns=['diagnosed_dosha']).to_dict('records')
+        n = max(len(records), 1)
+
+        def per_row_ms(run, rows=n):
+            start = time.perf_counter()
+            run()
+            return (time.perf_counter() - start) * 1000 / rows
+
+        single = records[:min(len(records), 100)]
+        return {
+            'rows': len(records),
+            'model_batch_ms': per_row_ms(lambda: self.predict_dosha_batch(sample)),
+            'model_single_row_ms': per_row_ms(
+                lambda: [self.predict_dosha_batch({k: [v] for k, v in record.items()}) for record in single],
+                max(len(single), 1)
+            ),
+            'rules_per_row_ms': per_row_ms(lambda: [self.diagnose_dosha_comprehensive(record) for record in records]),
+            'rules_batch_ms': per_row_ms(lambda: self.diagnose_dosha_batch(sample))
+        }
+
+    def predict_dosha_batch(self, assessments) -> Dict:
+        '''
+        Classify a DataFrame or mapping of column arrays with the trained model.
+        Returns the same structure as diagnose_dosha_batch.
+        '''
+        with self._model_lock:
+            if self.dosha_classifier is None:
+                raise RuntimeError('No dosha classifier trained or loaded')
+            classes = self.dosha_classifier.classes_
+            probabilities = self.dosha_classifier.predict_proba(self.build_dosha_feature_matrix(assessments))
+
+        # Reorder the model's class columns as DOSHA_TYPES
+        confidence = np.zeros((len(probabilities), len(DOSHA_TYPES)))
+        for column, label in enumerate(classes):
+            if label in DOSHA_TYPES:
+                confidence[:, DOSHA_TYPES.index(label)] = probabilities[:, column]
+
+        top_two = np.sort(confidence, axis=1)[:, -2:]
+        return {
+            'dosha_types': DOSHA_TYPES,
+            'primary_dosha': np.array(DOSHA_TYPES, dtype=object)[confidence.argmax(axis=1)],
+            'confidence_scores': confidence,
+            'dual_dosha': (top_two[:, 1] - top_two[:, 0]) < DUAL_DOSHA_MARGIN
+        }
+
+    def start_inference_batcher(self, max_batch_size: int = 64, max_wait_ms: float = 2.0) -> DoshaInferenceBatcher:
+        '''
+        Serve diagnose_dosha_comprehensive from the trained classifier through
+        a micro-batching queue
+        '''
+        if self.dosha_classifier is None:
+            raise RuntimeError('No dosha classifier trained or loaded')
+        self.stop_inference_batcher()
+        self.inference_batcher = DoshaInferenceBatcher(self.predict_dosha_batch, max_batch_size, max_wait_ms)
+        return self.inference_batcher
+
+    def stop_inference_batcher(self):
+        '''
+        Drain the batcher and fall back to rule-based diagnosis
+        '''
+        batcher, self.inference_batcher = self.inference_batcher, None
+        if batcher is not None:
+            batcher.shutdown()
+
+    def _dosha_model_bundle(self) -> Dict:
+        '''
+        The classifier together with the encoders, imputation values and scaler it depends on
+        '''
+        return {
+            'model': self.dosha_classifier,
+            'label_encoders': self.label_encoders,
+            'feature_fill_values': self.feature_fill_values,
+            'scaler': self.scaler,
+            'feature_names': self.feature_names,
+            'saved_at': datetime.now().isoformat()
+        }
 
-            return assessment_id
+    def _install_dosha_model(self, bundle: Dict):
+        '''
+        Switch every model attribute at once; in-flight predictions finish on the old model
+        '''
+        with self._model_lock:
+            self.dosha_classifier = bundle['model']
+            self.label_encoders = bundle['label_encoders']
+            self.feature_fill_values = bundle['feature_fill_values']
+            self.scaler = bundle['scaler']
+            self.feature_names = bundle['feature_names']
 
-        except Exception as e:
-            print(f"Error creating assessment: {e}")
-            return None
+    def save_dosha_classifier(self, path: str) -> str:
+        '''
+        Persist the model bundle uncompressed so it can be memory-mapped on load
+        '''
+        _lazy_import('joblib').dump(self._dosha_model_bundle(), path)
+        return path
 
-    def diagnose_dosha_comprehensive(self, assessment_data: Dict) -> Dict:
+    def load_dosha_classifier(self, path: str, mmap_mode: str = None) -> Dict:
         '''
-        Comprehensive dosha diagnosis using ML model
+        Load a classifier bundle written by save_dosha_classifier
         '''
-        # Enhanced dosha diagnosis algorithm
-        scores = {'Vata': 0, 'Pitta': 0, 'Kapha': 0}
-
-        # Physical characteristics scoring
-        if assessment_data.get('body_frame') == 'Thin':
-            scores['Vata'] += 3
-        elif assessment_data.get('body_frame') == 'Medium':
-            scores['Pitta'] += 3
-        elif assessment_data.get('body_frame') == 'Heavy':
-            scores['Kapha'] += 3
-
-        # Skin type scoring
-        if assessment_data.get('skin_type') == 'Dry':
-            scores['Vata'] += 2
-        elif assessment_data.get('skin_type') == 'Oily':
-            scores['Pitta'] += 2
-        elif assessment_data.get('skin_type') == 'Normal':
-            scores['Kapha'] += 2
-
-        # Digestion scoring
-        if assessment_data.get('digestion') == 'Quick':
-            scores['Vata'] += 2
-        elif assessment_data.get('digestion') == 'Strong':
-            scores['Pitta'] += 2
-        elif assessment_data.get('digestion') == 'Slow':
-            scores['Kapha'] += 2
+        bundle = _lazy_import('joblib').load(path, mmap_mode=mmap_mode)
+        self._install_dosha_model(bundle)
+        return bundle
 
-        # Heart rate based classification (research-backed)
-        heart_rate = assessment_data.get('heart_rate')
-        if heart_rate:
-            if heart_rate >= 80:  # Vata: 80-90 bpm
-                scores['Vata'] += 2
-            elif heart_rate >= 70:  # Pitta: 70-80 bpm
-                scores['Pitta'] += 2
-            elif heart_rate >= 60:  # Kapha: 60-70 bpm
-                scores['Kapha'] += 2
+    @property
+    def model_registry(self) -> 'DoshaModelRegistry':
+        if self._model_registry is None:
+            self._model_registry = DoshaModelRegistry(self.model_dir)
+        return self._model_registry
 
-        # Blood pressure considerations
-        systolic_bp = assessment_data.get('systolic_bp')
-        if systolic_bp:
-            if systolic_bp > 140:  # Hypertension - often Pitta/Vata
-                scores['Pitta'] += 1
-                scores['Vata'] += 1
-
-        # Mental state scoring
-        if assessment_data.get('mental_state') == 'Anxious':
-            scores['Vata'] += 2
-        elif assessment_data.get('mental_state') == 'Irritable':
-            scores['Pitta'] += 2
-        elif assessment_data.get('mental_state') == 'Calm':
-            scores['Kapha'] += 2
-
-        # Sleep pattern scoring
-        if assessment_data.get('sleep_pattern') == 'Light sleeper':
-            scores['Vata'] += 1
-        elif assessment_data.get('sleep_pattern') == 'Sound sleeper':
-            scores['Kapha'] += 1
+    def publish_dosha_classifier(self, activate: bool = True, notes: str = '') -> Dict:
+        '''
+        Store the current classifier as a new registry version, optionally making it active
+        '''
+        if self.dosha_classifier is None:
+            return {'success': False, 'message': 'No dosha classifier trained or loaded'}
+        version = self.model_registry.publish(self._dosha_model_bundle(), notes)
+        if activate:
+            self.model_registry.set_active(version)
+        return {'success': True, 'version': version}
 
-        # Determine dominant dosha
-        total_score = sum(scores.values())
-        if total_score > 0:
-            confidence_scores = {k: v/total_score for k, v in scores.items()}
-            dominant_dosha = max(scores, key=scores.get)
-        else:
-            confidence_scores = {'Vata': 0.33, 'Pitta': 0.33, 'Kapha': 0.34}
-            dominant_dosha = 'Vata'  # Default
+    def activate_dosha_model(self, version: str = None, mmap_mode: Optional[str] = 'r') -> Dict:
+        '''
+        Hot-swap the serving model to a registry version (default: the registry's
+        active one). The bundle is loaded before the swap, so requests keep being
+        answered by the previous model until the new one is ready.
+        '''
+        version = version or self.model_registry.active_version()
+        if version is None:
+            return {'success': False, 'message': 'No model version published'}
+        try:
+            bundle, stats = self.model_registry.load(version, mmap_mode)
+        except FileNotFoundError:
+            return {'success': False, 'message': f'Unknown model version {version}'}
+        self._install_dosha_model(bundle)
+        self.model_registry.set_active(version)
+        return {'success': True, 'version': version, **stats}
 
-        return {
-            'primary_dosha': dominant_dosha,
-            'confidence_scores': confidence_scores,
-            'detailed_analysis': self.generate_dosha_analysis(dominant_dosha, confidence_scores)
-        }
+    def rescore_patient_assessments(self, chunk_size: int = 50000) -> int:
+        '''
+        Re-run dosha diagnosis over every stored assessment and update
+        diagnosed_dosha / dosha_confidence, committing after each chunk.
+        Chunks are read by id, so an interrupted run keeps the chunks it committed.
+        '''
+        fields = ['id', 'heart_rate', 'systolic_bp'] + list(DOSHA_CATEGORICAL_WEIGHTS)
+        connection = self.conn_patients
+        query = f"SELECT {', '.join(fields)} FROM patient_assessments WHERE id > ? ORDER BY id LIMIT ?"
+
+        updated = 0
+        last_id = 0
+        try:
+            while True:
+                rows = connection.execute(query, (last_id, chunk_size)).fetchall()
+                if not rows:
+                    break
+                columns = {field: [row[i] for row in rows] for i, field in enumerate(fields)}
+                result = self.diagnose_dosha_batch(columns)
+                top_confidence = result['confidence_scores'].max(axis=1)
+                connection.executemany('''
+                    UPDATE patient_assessments SET diagnosed_dosha = ?, dosha_confidence = ?
+                    WHERE id = ?
+                ''', zip(result['primary_dosha'].tolist(), top_confidence.tolist(), columns['id']))
+                connection.commit()
+                updated += len(rows)
+                last_id = columns['id'][-1]
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            # Every stored diagnosis may have changed
+            self.report_cache.clear()
+        return updated
 
     def generate_dosha_analysis(self, dosha: str, confidence: Dict) -> str:
         '''
@@ -447,7 +3136,7 @@ class EnhancedAyurvedicHealthcareSystem:
 
         # Check for dual dosha
         sorted_doshas = sorted(confidence.items(), key=lambda x: x[1], reverse=True)
-        if sorted_doshas[0][1] - sorted_doshas[1][1] < 0.2:
+        if sorted_doshas[0][1] - sorted_doshas[1][1] < DUAL_DOSHA_MARGIN:
             analysis += f" You may also have significant {sorted_doshas[1][0]} characteristics."
 
         return analysis + confidence_text
@@ -585,113 +3274,103 @@ class EnhancedAyurvedicHealthcareSystem:
         '''
         Calculate daily nutritional requirements based on patient profile
         '''
-        age = patient_data.get('age', 30)
-        gender = patient_data.get('gender', 'Male')
-        weight = patient_data.get('weight', 70)
-        height = patient_data.get('height', 170)
-        activity_level = patient_data.get('exercise', 'Moderate')
+        age = patient_data.get('age', NUTRITION_DEFAULTS['age'])
+        gender = patient_data.get('gender', NUTRITION_DEFAULTS['gender'])
+        weight = patient_data.get('weight', NUTRITION_DEFAULTS['weight'])
+        height = patient_data.get('height', NUTRITION_DEFAULTS['height'])
+        activity_level = patient_data.get('exercise', NUTRITION_DEFAULTS['exercise'])
+        bmr_sex = 'male' if gender.lower() == 'male' else 'female'
+        rda_sex = 'female' if gender.lower() == 'female' else 'male'
 
         # Calculate BMR (Basal Metabolic Rate)
-        if gender.lower() == 'male':
-            bmr = 66 + (13.7 * weight) + (5 * height) - (6.8 * age)
-        else:
-            bmr = 655 + (9.6 * weight) + (1.8 * height) - (4.7 * age)
+        base, per_kg, per_cm, per_year = NUTRITION_BMR_COEFFICIENTS[bmr_sex]
+        bmr = base + (per_kg * weight) + (per_cm * height) - (per_year * age)
 
-        # Activity multipliers
-        activity_multipliers = {
-            'None': 1.2,
-            '1-2 days/week': 1.375,
-            '3-4 days/week': 1.55,
-            '5+ days/week': 1.725
-        }
-
-        multiplier = activity_multipliers.get(activity_level, 1.55)
+        multiplier = NUTRITION_ACTIVITY_MULTIPLIERS.get(activity_level, NUTRITION_DEFAULT_MULTIPLIER)
         daily_calories = bmr * multiplier
 
-        # Macronutrient distribution
-        protein_calories = daily_calories * 0.15  # 15% protein
-        carb_calories = daily_calories * 0.60     # 60% carbs
-        fat_calories = daily_calories * 0.25      # 25% fat
-
-        # Convert to grams
-        protein_grams = protein_calories / 4
-        carb_grams = carb_calories / 4
-        fat_grams = fat_calories / 9
-
-        # Micronutrients (simplified RDA values)
-        micronutrients = {
-            'iron': 18 if gender.lower() == 'female' else 10,
-            'calcium': 1000,
-            'vitamin_c': 65,
-            'vitamin_a': 700 if gender.lower() == 'female' else 900,
-            'folate': 400,
-            'vitamin_d': 15,
-            'magnesium': 320 if gender.lower() == 'female' else 420,
-            'potassium': 4700
+        # Macronutrient distribution, converted to grams
+        macronutrients = {
+            macro: round(daily_calories * share / calories_per_gram)
+            for macro, (share, calories_per_gram) in NUTRITION_MACRO_SHARES.items()
         }
+        macronutrients['fiber'] = NUTRITION_FIBER[rda_sex]
 
         return {
             'daily_calories': round(daily_calories),
-            'macronutrients': {
-                'protein': round(protein_grams),
-                'carbohydrates': round(carb_grams),
-                'fat': round(fat_grams),
-                'fiber': 25 if gender.lower() == 'female' else 30
-            },
-            'micronutrients': micronutrients
+            'macronutrients': macronutrients,
+            'micronutrients': dict(NUTRITION_MICRONUTRIENTS[rda_sex])
         }
 
-    def generate_weekly_diet_plan(self, dosha: str, nutritional_req: Dict, dietary_preferences: Dict = None) -> Dict:
+    def calculate_nutritional_requirements_batch(self, patients) -> np.ndarray:
         '''
-        Generate a comprehensive weekly diet plan
+        Vectorized calculate_nutritional_requirements over a DataFrame or a
+        mapping of column arrays. Returns a NUTRITION_BATCH_DTYPE structured
+        array with the same values as the per-patient function; absent columns
+        and missing values take the per-patient defaults.
         '''
-        # Base meal plans by dosha
-        base_plans = {
-            'Vata': {
-                'principles': ['Warm foods', 'Regular meals', 'Healthy fats', 'Sweet, sour, salty tastes'],
-                'avoid': ['Cold foods', 'Dry foods', 'Irregular eating'],
-                'daily_template': {
-                    'breakfast': ['Warm oatmeal with ghee and dates', 'Hot cereal with nuts', 'Warm milk with spices'],
-                    'lunch': ['Khichdi with vegetables', 'Rice with dal and cooked vegetables', 'Warm soup with bread'],
-                    'dinner': ['Light khichdi', 'Vegetable soup', 'Rice with dal'],
-                    'snacks': ['Dates and nuts', 'Warm milk', 'Herbal tea with biscuits']
-                }
-            },
-            'Pitta': {
-                'principles': ['Cool foods', 'Moderate portions', 'Sweet, bitter, astringent tastes'],
-                'avoid': ['Spicy foods', 'Sour foods', 'Excessive heat'],
-                'daily_template': {
-                    'breakfast': ['Cool porridge with coconut', 'Fresh fruit salad', 'Mild cereals'],
-                    'lunch': ['Rice with cooling vegetables', 'Salad with yogurt', 'Light dal with rice'],
-                    'dinner': ['Light salad', 'Cooling soups', 'Rice with mild curry'],
-                    'snacks': ['Sweet fruits', 'Coconut water', 'Milk-based drinks']
-                }
-            },
-            'Kapha': {
-                'principles': ['Light foods', 'Warm spices', 'Pungent, bitter, astringent tastes'],
-                'avoid': ['Heavy foods', 'Cold foods', 'Excessive dairy'],
-                'daily_template': {
-                    'breakfast': ['Herbal tea with light snacks', 'Spiced porridge', 'Fresh fruits'],
-                    'lunch': ['Barley with spiced vegetables', 'Light dal with vegetables', 'Quinoa salad'],
-                    'dinner': ['Vegetable soup', 'Light curry with millet', 'Herbal tea'],
-                    'snacks': ['Spiced tea', 'Light crackers', 'Ginger preparations']
-                }
-            }
-        }
+        n = _column_length(patients)
 
-        plan = base_plans.get(dosha, base_plans['Vata'])
+        def numeric(field):
+            if field not in patients:
+                return np.full(n, float(NUTRITION_DEFAULTS[field]))
+            values = _as_float_column(patients[field])
+            return np.where(np.isnan(values), NUTRITION_DEFAULTS[field], values)
 
-        # Generate 7-day plan
-        weekly_plan = {}
-        days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        def factorize(field):
+            # Distinct values and per-row indices, so each value is mapped once
+            if field not in patients:
+                return np.array([NUTRITION_DEFAULTS[field]]), np.zeros(n, dtype=np.intp)
+            values = np.asarray(patients[field])
+            if values.dtype.kind != 'U':
+                values = values.astype(object)
+                # None, or NaN as left by pandas, counts as missing
+                values[np.equal(values, None) | np.not_equal(values, values)] = NUTRITION_DEFAULTS[field]
+                values = values.astype(str)
+            uniques, inverse = np.unique(values, return_inverse=True)
+            return uniques, inverse.reshape(-1)
 
-        for i, day in enumerate(days):
-            daily_plan = {}
-            for meal, options in plan['daily_template'].items():
-                # Rotate through options
-                daily_plan[meal] = options[i % len(options)]
+        genders, gender_index = factorize('gender')
+        is_male = np.array([value.lower() == 'male' for value in genders])[gender_index]
+        is_female = np.array([value.lower() == 'female' for value in genders])[gender_index]
+        activities, activity_index = factorize('exercise')
+        multiplier = np.array([
+            NUTRITION_ACTIVITY_MULTIPLIERS.get(value, NUTRITION_DEFAULT_MULTIPLIER) for value in activities
+        ])[activity_index]
 
-            weekly_plan[day] = daily_plan
+        male, female = (np.array(NUTRITION_BMR_COEFFICIENTS[sex], dtype=float) for sex in ('male', 'female'))
+        base, per_kg, per_cm, per_year = np.where(is_male[:, None], male, female).T
+        # Same operation order as the scalar formula so results are bit-identical
+        bmr = base + (per_kg * numeric('weight')) + (per_cm * numeric('height')) - (per_year * numeric('age'))
+        daily_calories = bmr * multiplier
+
+        result = np.empty(n, dtype=NUTRITION_BATCH_DTYPE)
+        # np.rint rounds half to even, as round() does for floats
+        result['daily_calories'] = np.rint(daily_calories)
+        for macro, (share, calories_per_gram) in NUTRITION_MACRO_SHARES.items():
+            result[macro] = np.rint(daily_calories * share / calories_per_gram)
+        result['fiber'] = np.where(is_female, NUTRITION_FIBER['female'], NUTRITION_FIBER['male'])
+        for nutrient, female_value in NUTRITION_MICRONUTRIENTS['female'].items():
+            result[nutrient] = np.where(is_female, female_value, NUTRITION_MICRONUTRIENTS['male'][nutrient])
+        return result
+
+    def generate_weekly_diet_plan(self, dosha: str, nutritional_req: Dict, dietary_preferences: Dict = None,
+                                  optimize: bool = False) -> Dict:
+        '''
+        Generate a comprehensive weekly diet plan.
+        With optimize=True the plan also carries 'optimized_daily_intake': food
+        grams and recipe servings solved against the nutritional targets,
+        rounded to the memo buckets. dietary_preferences may list food or
+        recipe keys under 'exclude'.
+        Weekly meals and the optimized intake are memoized, read-only
+        structures shared between plans; copy before editing. The list
+        fields (principles, foods_to_avoid, shopping_list, cooking_tips)
+        are fresh lists per plan.
+        '''
+        template_dosha = dosha if dosha in DOSHA_BASE_PLANS else 'Vata'
+        fragments = self.plan_memo.get_or_build(
+            ('template', template_dosha), lambda: self._build_plan_fragments(template_dosha)
+        )
 
         # Calculate approximate nutrition for the week
         daily_nutrition = {
@@ -701,21 +3380,337 @@ class EnhancedAyurvedicHealthcareSystem:
             'fat': nutritional_req['macronutrients']['fat']
         }
 
-        return {
+        diet_plan = {
             'dosha': dosha,
+            'principles': list(fragments['principles']),
+            'foods_to_avoid': list(fragments['foods_to_avoid']),
+            'weekly_meals': fragments['weekly_meals'],
+            'daily_nutritional_targets': daily_nutrition,
+            'shopping_list': list(fragments['shopping_list']),
+            'cooking_tips': list(fragments['cooking_tips'])
+        }
+
+        if optimize:
+            bucketed_req = _bucket_requirements(nutritional_req)
+            exclude = (dietary_preferences or {}).get('exclude', ())
+            key = (
+                'optimized', template_dosha, _canonical_preferences(dietary_preferences),
+                json.dumps(bucketed_req, sort_keys=True)
+            )
+            # Budget fallbacks are approximate, so only exact solutions are memoized
+            diet_plan['optimized_daily_intake'] = self.plan_memo.get_or_build(
+                key, lambda: self.diet_optimizer.solve(template_dosha, bucketed_req, exclude),
+                cacheable=lambda intake: intake['method'] == 'bvls'
+            )
+
+        return diet_plan
+
+    def _build_plan_fragments(self, dosha: str) -> Dict:
+        '''
+        Build the dosha-dependent parts of a weekly plan
+        '''
+        plan = DOSHA_BASE_PLANS[dosha]
+
+        # Generate 7-day plan
+        weekly_plan = {}
+        for i, day in enumerate(WEEK_DAYS):
+            daily_plan = {}
+            for meal, options in plan['daily_template'].items():
+                # Rotate through options
+                daily_plan[meal] = options[i % len(options)]
+
+            weekly_plan[day] = daily_plan
+
+        return {
             'principles': plan['principles'],
             'foods_to_avoid': plan['avoid'],
             'weekly_meals': weekly_plan,
-            'daily_nutritional_targets': daily_nutrition,
             'shopping_list': self.generate_shopping_list(weekly_plan),
-            'cooking_tips': self.get_dosha_cooking_tips(dosha)
+            'cooking_tips': DOSHA_COOKING_TIPS[dosha]
+        }
+
+    @property
+    def diet_optimizer(self) -> DietPlanOptimizer:
+        '''
+        Diet plan optimizer over the current food catalog and recipes
+        '''
+        optimizer = self._diet_optimizer
+        if optimizer is None or optimizer.catalog is not self.food_catalog \
+                or optimizer.recipe_database is not self.recipe_database:
+            optimizer = self._diet_optimizer = DietPlanOptimizer(self.food_catalog, self.recipe_database)
+        return optimizer
+
+    def iter_plan_days(self, dosha: str, start_date: date = None, days: int = 30):
+        '''
+        Yield a long-horizon plan one day at a time, continuing the weekly
+        meal rotation across the whole horizon
+        '''
+        plan = DOSHA_BASE_PLANS.get(dosha, DOSHA_BASE_PLANS['Vata'])
+        start_date = start_date or date.today()
+        for day_index in range(days):
+            plan_date = start_date + timedelta(days=day_index)
+            yield {
+                'day_index': day_index,
+                'date': plan_date.isoformat(),
+                'day': WEEK_DAYS[plan_date.weekday()],
+                'meals': {meal: options[day_index % len(options)] for meal, options in plan['daily_template'].items()}
+            }
+
+    def create_long_term_diet_plan(self, plan_request: Dict, plan_type: str = 'monthly',
+                                   start_date: date = None, batch_size: int = 1000) -> int:
+        '''
+        Persist one monthly or quarterly plan and return its diet_plans id.
+        plan_request holds patient_id, doctor_id, assessment_id, dosha and
+        nutritional_req; days may override the plan_type horizon.
+        '''
+        plan_ids = list(self._write_long_term_plans([plan_request], plan_type, start_date, batch_size))
+        return plan_ids[0]
+
+    def generate_long_term_plans(self, plan_requests, plan_type: str = 'monthly',
+                                 start_date: date = None, batch_size: int = 1000) -> Dict:
+        '''
+        Stream plans for many patients into diet_plans / diet_plan_days.
+        Requests are consumed lazily and whole plans are written in batched
+        transactions, so memory does not grow with patient count.
+        '''
+        start = time.perf_counter()
+        plans = 0
+        for _ in self._write_long_term_plans(plan_requests, plan_type, start_date, batch_size):
+            plans += 1
+        return {'plans': plans, 'elapsed_seconds': time.perf_counter() - start}
+
+    def _write_long_term_plans(self, plan_requests, plan_type: str, start_date: date, batch_size: int):
+        '''
+        Encode whole plans into a buffer and write them, with their days, once
+        batch_size day rows are pending. Every transaction ends on a plan
+        boundary, so a failure never leaves a partial plan behind. Each new
+        plan deactivates the patient's older ones; ids are yielded once committed.
+        '''
+        start_date = start_date or date.today()
+        connection = self.conn_patients
+        pending_plans = []
+        pending_days = 0
+
+        def flush():
+            plan_ids = []
+            try:
+                for header, day_rows in pending_plans:
+                    connection.execute('''
+                        UPDATE diet_plans SET is_active = FALSE WHERE patient_id = ? AND is_active
+                    ''', (header[0],))
+                    cursor = connection.execute('''
+                        INSERT INTO diet_plans (patient_id, doctor_id, assessment_id, plan_type,
+                                                start_date, end_date, plan_data, nutritional_targets)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', header)
+                    plan_id = cursor.lastrowid
+                    connection.executemany('''
+                        INSERT INTO diet_plan_days (plan_id, day_index, plan_date, meals) VALUES (?, ?, ?, ?)
+                    ''', [(plan_id, *day_row) for day_row in day_rows])
+                    plan_ids.append(plan_id)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            pending_plans.clear()
+            return plan_ids
+
+        for plan_request in plan_requests:
+            days = plan_request.get('days') or PLAN_HORIZON_DAYS[plan_type]
+            dosha = plan_request['dosha']
+            template_dosha = dosha if dosha in DOSHA_BASE_PLANS else 'Vata'
+            summary = {
+                'dosha': dosha,
+                'principles': DOSHA_BASE_PLANS[template_dosha]['principles'],
+                'foods_to_avoid': DOSHA_BASE_PLANS[template_dosha]['avoid'],
+                'cooking_tips': DOSHA_COOKING_TIPS[template_dosha],
+                'days': days
+            }
+
+            # Everything is encoded before the write transaction opens
+            header = (
+                plan_request['patient_id'],
+                plan_request['doctor_id'],
+                plan_request['assessment_id'],
+                plan_type,
+                start_date.isoformat(),
+                (start_date + timedelta(days=days - 1)).isoformat(),
+                self.encode_plan_data(summary),
+                self.encode_plan_data(plan_request.get('nutritional_req'))
+            )
+            day_rows = [
+                (plan_day['day_index'], plan_day['date'], self.encode_plan_data(plan_day['meals']))
+                for plan_day in self.iter_plan_days(dosha, start_date, days)
+            ]
+            pending_plans.append((header, day_rows))
+            pending_days += len(day_rows)
+
+            if pending_days >= batch_size:
+                yield from flush()
+                pending_days = 0
+
+        if pending_plans:
+            yield from flush()
+
+    def iter_stored_plan_days(self, plan_id: int, batch_size: int = 500):
+        '''
+        Stream the stored days of a long-horizon plan in order
+        '''
+        cursor = self.conn_patients.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute('''
+            SELECT day_index, plan_date, meals FROM diet_plan_days WHERE plan_id = ? ORDER BY day_index
+        ''', (plan_id,))
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for day_index, plan_date, meals in rows:
+                yield {'day_index': day_index, 'date': plan_date, 'meals': self.decode_plan_data(meals)}
+
+    def encode_plan_data(self, value):
+        '''
+        Encode a plan_data / nutritional_targets value in the configured storage format
+        '''
+        if self.plan_storage_format == 'json':
+            return json.dumps(value)
+        return encode_plan(value, self.plan_strings, self.conn_patients)
+
+    def decode_plan_data(self, stored):
+        '''
+        Decode a stored JSON TEXT or binary BLOB plan value
+        '''
+        if isinstance(stored, bytes):
+            return decode_plan(stored, self.plan_strings)
+        return json.loads(stored) if stored else None
+
+    def save_diet_plan(self, plan_request: Dict, diet_plan: Dict, plan_type: str = 'weekly',
+                       start_date: date = None) -> int:
+        '''
+        Persist a generated plan (e.g. from generate_weekly_diet_plan) to diet_plans
+        '''
+        start_date = start_date or date.today()
+        plan_data = self.encode_plan_data(diet_plan)
+        nutritional_targets = self.encode_plan_data(plan_request.get('nutritional_req'))
+        connection = self.conn_patients
+        try:
+            cursor = connection.execute('''
+                INSERT INTO diet_plans (patient_id, doctor_id, assessment_id, plan_type,
+                                        start_date, end_date, plan_data, nutritional_targets)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                plan_request['patient_id'],
+                plan_request['doctor_id'],
+                plan_request['assessment_id'],
+                plan_type,
+                start_date.isoformat(),
+                (start_date + timedelta(days=PLAN_HORIZON_DAYS.get(plan_type, 7) - 1)).isoformat(),
+                plan_data,
+                nutritional_targets
+            ))
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return cursor.lastrowid
+
+    def load_diet_plan(self, plan_id: int) -> Optional[Dict]:
+        '''
+        Load a stored plan; plan_data and nutritional_targets decode lazily
+        '''
+        row = self.conn_patients.execute('''
+            SELECT id, patient_id, doctor_id, assessment_id, plan_type, created_date,
+                   start_date, end_date, plan_data, nutritional_targets, is_active
+            FROM diet_plans WHERE id = ?
+        ''', (plan_id,)).fetchone()
+        if row is None:
+            return None
+
+        return {
+            'id': row[0],
+            'patient_id': row[1],
+            'doctor_id': row[2],
+            'assessment_id': row[3],
+            'plan_type': row[4],
+            'created_date': row[5],
+            'start_date': row[6],
+            'end_date': row[7],
+            'plan_data': LazyPlanData(row[8], self.plan_strings),
+            'nutritional_targets': LazyPlanData(row[9], self.plan_strings),
+            'is_active': bool(row[10])
         }
 
+    def export_diet_plan_json(self, plan_id: int) -> Optional[str]:
+        '''
+        Export a stored plan, including any per-day rows, as JSON
+        '''
+        plan = self.load_diet_plan(plan_id)
+        if plan is None:
+            return None
+        plan['plan_data'] = plan['plan_data'].to_dict()
+        plan['nutritional_targets'] = plan['nutritional_targets'].to_dict()
+        days = list(self.iter_stored_plan_days(plan_id))
+        if days:
+            plan['days'] = days
+        return json.dumps(plan)
+
+    def import_diet_plan_json(self, plan_json) -> int:
+        '''
+        Import a plan exported by export_diet_plan_json (JSON string or dict)
+        and store it in the configured format; returns the new plan id
+        '''
+        plan = json.loads(plan_json) if isinstance(plan_json, str) else plan_json
+        start_date = date.fromisoformat(plan['start_date']) if plan.get('start_date') else date.today()
+        plan_data = self.encode_plan_data(plan.get('plan_data'))
+        nutritional_targets = self.encode_plan_data(plan.get('nutritional_targets'))
+        day_rows = [(day['day_index'], day['date'], self.encode_plan_data(day['meals'])) for day in plan.get('days', [])]
+        connection = self.conn_patients
+        try:
+            cursor = connection.execute('''
+                INSERT INTO diet_plans (patient_id, doctor_id, assessment_id, plan_type,
+                                        start_date, end_date, plan_data, nutritional_targets, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                plan['patient_id'],
+                plan['doctor_id'],
+                plan['assessment_id'],
+                plan['plan_type'],
+                start_date.isoformat(),
+                plan.get('end_date'),
+                plan_data,
+                nutritional_targets,
+                plan.get('is_active', True)
+            ))
+            plan_id = cursor.lastrowid
+            connection.executemany('''
+                INSERT INTO diet_plan_days (plan_id, day_index, plan_date, meals) VALUES (?, ?, ?, ?)
+            ''', [(plan_id, *day_row) for day_row in day_rows])
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return plan_id
+
+    @property
+    def shopping_engine(self) -> ShoppingListEngine:
+        '''
+        Shopping list engine compiled from the current recipe database
+        '''
+        engine = self._shopping_engine
+        if engine is None or engine.recipe_database is not self.recipe_database:
+            food_keys = [food for foods in self.food_database.values() for food in foods]
+            engine = self._shopping_engine = ShoppingListEngine(self.recipe_database, food_keys)
+        return engine
+
     def generate_shopping_list(self, weekly_plan: Dict) -> List[str]:
         '''
         Generate shopping list from weekly meal plan
         '''
-        # Simplified shopping list generation
+        order = self.shopping_engine.order([weekly_plan])
+        if order:
+            return [f"{self._ingredient_display_name(name)}: {grams:g} g" for name, grams in order.items()]
+
+        # No meal maps to a known recipe; fall back to the staple list
         base_ingredients = {
             'Grains': ['Rice', 'Oats', 'Quinoa', 'Barley'],
             'Pulses': ['Moong dal', 'Chana dal', 'Masoor dal'],
@@ -730,42 +3725,84 @@ class EnhancedAyurvedicHealthcareSystem:
 
         return shopping_list
 
-    def get_dosha_cooking_tips(self, dosha: str) -> List[str]:
+    def generate_kitchen_order(self, plans, servings_per_meal: float = 1.0) -> Dict:
         '''
-        Get dosha-specific cooking tips
+        Weekly procurement totals in grams for a kitchen serving many patients'
+        plans, including optimized food and recipe intakes. plans may be any
+        iterable, generators included; it is consumed once.
         '''
-        tips = {
-            'Vata': [
-                'Cook with warming spices like ginger and cinnamon',
-                'Use adequate oil or ghee in cooking',
-                'Prefer steaming and sautéing over raw preparations',
-                'Eat meals warm and at regular times'
-            ],
-            'Pitta': [
-                'Use cooling spices like coriander and fennel',
-                'Avoid excessive heating and frying',
-                'Include fresh herbs like cilantro and mint',
-                'Cook with coconut oil or moderate ghee'
-            ],
-            'Kapha': [
-                'Use warming spices like black pepper and mustard seeds',
-                'Minimize oil and heavy ingredients',
-                'Prefer baking, roasting, and steaming',
-                'Include plenty of vegetables and light proteins'
+        patients = 0
+
+        def counted_plans():
+            nonlocal patients
+            for plan in plans:
+                patients += 1
+                yield plan
+
+        order = self.shopping_engine.order(counted_plans(), servings_per_meal)
+        return {
+            'patients': patients,
+            'items': [
+                {'ingredient': name, 'name': self._ingredient_display_name(name), 'grams': grams}
+                for name, grams in order.items()
             ]
         }
 
-        return tips.get(dosha, tips['Vata'])
+    def _ingredient_display_name(self, key: str) -> str:
+        for foods in self.food_database.values():
+            if key in foods:
+                return foods[key]['name']
+        return key.replace('_', ' ').title()
+
+    def get_dosha_cooking_tips(self, dosha: str) -> List[str]:
+        '''
+        Get dosha-specific cooking tips
+        '''
+        return list(DOSHA_COOKING_TIPS.get(dosha, DOSHA_COOKING_TIPS['Vata']))
 
     def generate_professional_report(self, patient_id: int, assessment_id: int, doctor_id: int) -> Dict:
         '''
-        Generate comprehensive professional medical report
+        Generate comprehensive professional medical report, served from the
+        report cache when the same report was built recently and neither
+        profile has changed since
+        '''
+        # Read before building, so a profile write during the build misses next time
+        profile_version = self._profile_version(patient_id, doctor_id)
+        report = self.report_cache.get(assessment_id, patient_id, doctor_id, profile_version)
+        if report is not None:
+            return report
+
+        report = self._build_professional_report(patient_id, assessment_id, doctor_id)
+        if 'error' not in report:
+            self.report_cache.put(assessment_id, patient_id, doctor_id, report, profile_version)
+        return report
+
+    def _profile_version(self, patient_id: int, doctor_id: int) -> int:
+        '''
+        Sum of the two users' profile versions; it grows on any write to either profile
+        '''
+        return self.conn_users.execute(
+            'SELECT COALESCE(SUM(version), 0) FROM profile_versions WHERE user_id IN (?, ?)',
+            (patient_id, doctor_id)
+        ).fetchone()[0]
+
+    def invalidate_reports_for_user(self, user_id: int):
+        '''
+        Drop cached reports after a patient or doctor profile row changes
+        '''
+        self.report_cache.invalidate_users([user_id])
+
+    def _build_professional_report(self, patient_id: int, assessment_id: int, doctor_id: int) -> Dict:
+        '''
+        Query both databases and build one professional report
         '''
         try:
             # Get patient details
             cursor = self.conn_users.cursor()
+            cursor.row_factory = sqlite3.Row
             cursor.execute('''
-                SELECT u.name, u.email, u.phone, pp.emergency_contact
+                SELECT u.name AS patient_name, u.email AS patient_email, u.phone AS patient_phone,
+                       pp.emergency_contact
                 FROM users u
                 JOIN patient_profiles pp ON u.id = pp.user_id
                 WHERE u.id = ?
@@ -774,7 +3811,8 @@ class EnhancedAyurvedicHealthcareSystem:
 
             # Get doctor details
             cursor.execute('''
-                SELECT u.name, u.email, dp.license_number, dp.hospital_location, dp.specialization
+                SELECT u.name AS doctor_name, u.email AS doctor_email, dp.license_number,
+                       dp.hospital_location, dp.specialization
                 FROM users u
                 JOIN doctor_profiles dp ON u.id = dp.user_id
                 WHERE u.id = ?
@@ -783,48 +3821,120 @@ class EnhancedAyurvedicHealthcareSystem:
 
             # Get assessment details
             cursor = self.conn_patients.cursor()
-            cursor.execute('''
-                SELECT * FROM patient_assessments WHERE id = ?
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(f'''
+                SELECT {REPORT_ASSESSMENT_COLUMNS} FROM patient_assessments a WHERE a.id = ?
             ''', (assessment_id,))
             assessment = cursor.fetchone()
 
             if not all([patient_info, doctor_info, assessment]):
                 return {'error': 'Required data not found'}
 
-            # Generate report
-            report = {
-                'report_id': f"AYU-{assessment_id}-{datetime.now().strftime('%Y%m%d')}",
-                'generated_date': datetime.now().strftime('%B %d, %Y'),
-                'patient_details': {
-                    'name': patient_info[0],
-                    'email': patient_info[1],
-                    'phone': patient_info[2],
-                    'emergency_contact': patient_info[3]
-                },
-                'doctor_details': {
-                    'name': doctor_info[0],
-                    'license': doctor_info[2],
-                    'hospital': doctor_info[3],
-                    'specialization': doctor_info[4],
-                    'email': doctor_info[1]
-                },
-                'assessment_summary': {
-                    'age': assessment[3],
-                    'gender': assessment[4],
-                    'bmi': round(assessment[7], 1) if assessment[7] else 'N/A',
-                    'blood_pressure': f"{assessment[9]}/{assessment[10]}" if assessment[9] and assessment[10] else 'N/A',
-                    'heart_rate': f"{assessment[11]} bpm" if assessment[11] else 'N/A',
-                    'diagnosed_dosha': assessment[33] or 'Assessment Pending'
-                },
-                'recommendations': 'Follow prescribed Ayurvedic diet plan and lifestyle recommendations.',
-                'next_followup': (datetime.now() + timedelta(days=30)).strftime('%B %d, %Y')
-            }
-
-            return report
+            return self._format_professional_report({**patient_info, **doctor_info, **assessment}, datetime.now())
 
         except Exception as e:
             return {'error': str(e)}
 
+    def generate_professional_reports(self, doctor_id: int = None, start_date: str = None,
+                                      end_date: str = None, batch_size: int = 500):
+        '''
+        Yield professional reports for every assessment by a doctor and/or
+        within an inclusive assessment date range, using one joined query
+        across patients.db and the attached users.db
+        '''
+        conditions = []
+        params = []
+        if doctor_id is not None:
+            conditions.append('a.doctor_id = ?')
+            params.append(doctor_id)
+        if start_date is not None:
+            conditions.append('a.assessment_date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("a.assessment_date < date(?, '+1 day')")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        cursor = self._patients_connection_with_users().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.arraysize = batch_size
+        cursor.execute(f'''
+            SELECT {REPORT_ASSESSMENT_COLUMNS},
+                   pu.name AS patient_name, pu.email AS patient_email, pu.phone AS patient_phone,
+                   pp.emergency_contact,
+                   du.name AS doctor_name, du.email AS doctor_email, dp.license_number,
+                   dp.hospital_location, dp.specialization
+            FROM patient_assessments a
+            JOIN users_db.users pu ON pu.id = a.patient_id
+            JOIN users_db.patient_profiles pp ON pp.user_id = a.patient_id
+            JOIN users_db.users du ON du.id = a.doctor_id
+            JOIN users_db.doctor_profiles dp ON dp.user_id = a.doctor_id
+            {where}
+            ORDER BY a.assessment_date, a.id
+        ''', params)
+
+        generated_at = datetime.now()
+        try:
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._format_professional_report(row, generated_at)
+        finally:
+            cursor.close()
+
+    def generate_cohort_analytics(self, workers: int = 0, chunk_size: int = 100000) -> Dict:
+        '''
+        Population statistics by age band, gender and hospital location,
+        streamed out of core by cohort_analytics.CohortAnalytics
+        '''
+        from cohort_analytics import CohortAnalytics
+        analytics = CohortAnalytics(self.patients_db, self.users_db, chunk_size=chunk_size)
+        return analytics.compute(workers=workers)
+
+    def _patients_connection_with_users(self) -> sqlite3.Connection:
+        '''
+        The calling thread's patients connection with users.db attached as users_db
+        '''
+        connection = self.conn_patients
+        attached = {row[1] for row in connection.execute('PRAGMA database_list')}
+        if 'users_db' not in attached:
+            connection.execute('ATTACH DATABASE ? AS users_db', (self.users_db,))
+        return connection
+
+    def _format_professional_report(self, row, generated_at: datetime) -> Dict:
+        '''
+        Build a report dict from named patient, doctor and assessment fields
+        '''
+        return {
+            'report_id': f"AYU-{row['assessment_id']}-{generated_at.strftime('%Y%m%d')}",
+            'generated_date': generated_at.strftime('%B %d, %Y'),
+            'patient_details': {
+                'name': row['patient_name'],
+                'email': row['patient_email'],
+                'phone': row['patient_phone'],
+                'emergency_contact': row['emergency_contact']
+            },
+            'doctor_details': {
+                'name': row['doctor_name'],
+                'license': row['license_number'],
+                'hospital': row['hospital_location'],
+                'specialization': row['specialization'],
+                'email': row['doctor_email']
+            },
+            'assessment_summary': {
+                'age': row['age'],
+                'gender': row['gender'],
+                'bmi': round(row['bmi'], 1) if row['bmi'] else 'N/A',
+                'blood_pressure': f"{row['systolic_bp']}/{row['diastolic_bp']}" if row['systolic_bp'] and row['diastolic_bp'] else 'N/A',
+                'heart_rate': f"{row['heart_rate']} bpm" if row['heart_rate'] else 'N/A',
+                'diagnosed_dosha': row['diagnosed_dosha'] or 'Assessment Pending'
+            },
+            'recommendations': 'Follow prescribed Ayurvedic diet plan and lifestyle recommendations.',
+            'next_followup': (generated_at + timedelta(days=30)).strftime('%B %d, %Y')
+        }
+
     def get_patient_progress(self, patient_id: int) -> Dict:
         '''
         Get patient progress data for tracking
@@ -842,58 +3952,249 @@ class EnhancedAyurvedicHealthcareSystem:
         if not assessments:
             return {'message': 'No assessment history found'}
 
-        # Format progress data
+        # Format progress data; missing readings stay as None so every
+        # series lines up with dates
         progress = {
             'dates': [row[0] for row in assessments],
-            'weight': [row[1] for row in assessments if row[1]],
-            'systolic_bp': [row[2] for row in assessments if row[2]],
-            'diastolic_bp': [row[3] for row in assessments if row[3]],
-            'heart_rate': [row[4] for row in assessments if row[4]]
+            'weight': [row[1] for row in assessments],
+            'systolic_bp': [row[2] for row in assessments],
+            'diastolic_bp': [row[3] for row in assessments],
+            'heart_rate': [row[4] for row in assessments]
         }
 
         return progress
 
+    def get_patient_progress_series(self, patient_id: int, start_date: str = None, end_date: str = None,
+                                    bucket: str = 'auto', max_points: int = 200, cursor: str = None,
+                                    rolling_window: int = None) -> Dict:
+        '''
+        Chart-ready progress series within an inclusive date range.
+        bucket is 'raw', one of PROGRESS_BUCKETS (averaged in SQL) or 'auto',
+        which picks the finest bucket yielding at most max_points points.
+        Pages hold max_points points; pass the returned next_cursor to continue.
+        rolling_window adds trailing rolling means over that many points.
+        '''
+        conditions = ['patient_id = ?']
+        params = [patient_id]
+        if start_date is not None:
+            conditions.append('assessment_date >= ?')
+            params.append(start_date)
+        if end_date is not None:
+            conditions.append("assessment_date < date(?, '+1 day')")
+            params.append(end_date)
+
+        connection = self.conn_patients
+        if bucket == 'auto':
+            bucket = self._choose_progress_bucket(connection, ' AND '.join(conditions), params, max_points)
+
+        if bucket == 'raw':
+            date_expr = 'assessment_date'
+            if cursor is not None:
+                cursor_date, cursor_id = cursor.rsplit('|', 1)
+                conditions.append('(assessment_date, id) > (?, ?)')
+                params.extend([cursor_date, int(cursor_id)])
+            select = f"assessment_date, id, {', '.join(PROGRESS_METRICS)}, 1"
+            group_order = 'ORDER BY assessment_date, id'
+        else:
+            date_expr = PROGRESS_BUCKETS[bucket]
+            if cursor is not None:
+                conditions.append(f'{date_expr} > ?')
+                params.append(cursor)
+            averages = ', '.join(f'AVG({metric})' for metric in PROGRESS_METRICS)
+            select = f'{date_expr} AS bucket_date, NULL, {averages}, COUNT(*)'
+            group_order = 'GROUP BY bucket_date ORDER BY bucket_date'
+
+        rows = connection.execute(f'''
+            SELECT {select}
+            FROM patient_assessments
+            WHERE {' AND '.join(conditions)}
+            {group_order}
+            LIMIT ?
+        ''', params + [max_points + 1]).fetchall()
+
+        has_more = len(rows) > max_points
+        rows = rows[:max_points]
+
+        series = {
+            'patient_id': patient_id,
+            'bucket': bucket,
+            'dates': [row[0] for row in rows],
+            'counts': [row[-1] for row in rows]
+        }
+        for i, metric in enumerate(PROGRESS_METRICS, start=2):
+            series[metric] = [row[i] for row in rows]
+
+        if rolling_window:
+            for metric in PROGRESS_METRICS:
+                series[f'{metric}_rolling'] = _rolling_mean(series[metric], rolling_window)
+
+        series['weight_trend_per_week'] = _weekly_trend(series['dates'], series['weight'])
+
+        if has_more:
+            last = rows[-1]
+            series['next_cursor'] = f'{last[0]}|{last[1]}' if bucket == 'raw' else last[0]
+        else:
+            series['next_cursor'] = None
+        return series
+
+    def _choose_progress_bucket(self, connection: sqlite3.Connection, where: str, params: List,
+                                max_points: int) -> str:
+        '''
+        Finest granularity whose point count over the range fits max_points
+        '''
+        count, first, last = connection.execute(f'''
+            SELECT COUNT(*), MIN(assessment_date), MAX(assessment_date)
+            FROM patient_assessments WHERE {where}
+        ''', params).fetchone()
+        if count <= max_points:
+            return 'raw'
+        span_days = (datetime.fromisoformat(last[:19]) - datetime.fromisoformat(first[:19])).days + 1
+        for bucket, width_days in PROGRESS_BUCKET_DAYS.items():
+            if span_days / width_days <= max_points:
+                return bucket
+        return 'year'
+
 # Multi-language Support System
+# One compact JSON catalog per language: {"fallback": [...], "messages": {...}}
+TRANSLATION_CATALOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+TRANSLATION_DEFAULT_FALLBACK = ['english']
+# Language names double as file names, so nothing else may reach the file system
+TRANSLATION_LANGUAGE_PATTERN = re.compile(r'^[a-z_]+$')
+
+def _valid_language(language) -> bool:
+    return isinstance(language, str) and TRANSLATION_LANGUAGE_PATTERN.match(language) is not None
+
 class MultiLanguageSupport:
-    def __init__(self):
-        self.translations = {
-            'english': {
-                'dashboard': 'Dashboard',
-                'patient_assessment': 'Patient Assessment',
-                'diet_plan': 'Diet Plan',
-                'weekly_plan': 'Weekly Plan',
-                'monthly_plan': 'Monthly Plan',
-                'blood_pressure': 'Blood Pressure',
-                'heart_rate': 'Heart Rate',
-                'dosha_diagnosis': 'Dosha Diagnosis',
-                'nutritional_requirements': 'Nutritional Requirements',
-                'recipe_instructions': 'Recipe Instructions'
-            },
-            'hindi': {
-                'dashboard': 'डैशबोर्ड',
-                'patient_assessment': 'रोगी मूल्यांकन', 
-                'diet_plan': 'आहार योजना',
-                'weekly_plan': 'साप्ताहिक योजना',
-                'monthly_plan': 'मासिक योजना',
-                'blood_pressure': 'रक्तचाप',
-                'heart_rate': 'हृदय गति',
-                'dosha_diagnosis': 'दोष निदान',
-                'nutritional_requirements': 'पोषण आवश्यकताएं',
-                'recipe_instructions': 'व्यंजन विधि'
-            }
-        }
+    '''
+    Translations loaded lazily from per-language catalog files. Each loaded
+    language is flattened with its fallback chain into a single lookup
+    table; at most max_loaded tables are kept, least recently used first out.
+    Languages without a catalog are served the default language's table and
+    are not cached under their own name.
+    '''
+
+    def __init__(self, catalog_dir: str = TRANSLATION_CATALOG_DIR, max_loaded: int = 4):
+        self.catalog_dir = catalog_dir
+        self.max_loaded = max_loaded
+        self.translations = OrderedDict()  # language -> resolved lookup table
+        self._lock = threading.Lock()
+
+    def _catalog_path(self, language: str) -> str:
+        if not _valid_language(language):
+            raise ValueError(f'Invalid language name: {language!r}')
+        return os.path.join(self.catalog_dir, f'{language}.json')
+
+    def _has_catalog(self, language: str) -> bool:
+        return _valid_language(language) and os.path.isfile(self._catalog_path(language))
+
+    def _read_catalog(self, language: str) -> Optional[Dict]:
+        if not _valid_language(language):
+            return None
+        try:
+            with open(self._catalog_path(language), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _resolve(self, language: str) -> Dict:
+        '''
+        Merge a language's catalog over its fallback chain, nearest language winning
+        '''
+        chain, pending, seen = [], [language], set()
+        while pending:
+            current = pending.pop(0)
+            if current in seen:
+                continue
+            seen.add(current)
+            catalog = self._read_catalog(current)
+            if catalog is None:
+                continue
+            chain.append(catalog['messages'])
+            pending.extend(catalog.get('fallback', []))
+
+        lookup = {}
+        for messages in reversed(chain):
+            lookup.update(messages)
+        return lookup
+
+    def lookup_table(self, language: str) -> Dict:
+        '''
+        Resolved key -> text table for a language, loaded on first use;
+        None or any non-string language means the default language
+        '''
+        if not isinstance(language, str):
+            if not TRANSLATION_DEFAULT_FALLBACK:
+                return {}
+            language = TRANSLATION_DEFAULT_FALLBACK[0]
+        with self._lock:
+            table = self.translations.get(language)
+            if table is not None:
+                self.translations.move_to_end(language)
+                return table
+        if not self._has_catalog(language):
+            default = TRANSLATION_DEFAULT_FALLBACK[0] if TRANSLATION_DEFAULT_FALLBACK else None
+            if default is None or language == default or not self._has_catalog(default):
+                return {}
+            return self.lookup_table(default)
+        table = self._resolve(language)
+        with self._lock:
+            self.translations[language] = table
+            while len(self.translations) > self.max_loaded:
+                self.translations.popitem(last=False)
+        return table
 
     def translate(self, text: str, language: str = 'english') -> str:
         '''
         Translate text to specified language
         '''
-        return self.translations.get(language, {}).get(text, text)
+        return self.lookup_table(language).get(text, text)
+
+    def translate_structure(self, data, language: str = 'english', keys: bool = True, values: bool = True):
+        '''
+        Translate a whole plan or report in one pass: mapping keys and string
+        values that are catalog keys are replaced, everything else is copied
+        as is. Returns plain dicts and lists.
+        '''
+        table = self.lookup_table(language)
+        lookup = table.get
+
+        def walk(node):
+            if isinstance(node, Mapping):
+                return {
+                    (lookup(key, key) if keys and isinstance(key, str) else key): walk(value)
+                    for key, value in node.items()
+                }
+            if isinstance(node, (list, tuple)):
+                return [walk(item) for item in node]
+            if values and isinstance(node, str):
+                return lookup(node, node)
+            return node
+
+        return walk(data)
+
+    def save_catalog(self, language: str, messages: Dict, fallback: List[str] = None) -> str:
+        '''
+        Write or replace a language catalog and drop any cached tables built from it
+        '''
+        os.makedirs(self.catalog_dir, exist_ok=True)
+        path = self._catalog_path(language)
+        _write_text_atomic(path, json.dumps({
+            'fallback': list(TRANSLATION_DEFAULT_FALLBACK if fallback is None else fallback),
+            'messages': messages
+        }, ensure_ascii=False, separators=(',', ':')))
+        with self._lock:
+            # Any resolved table may include this language through its fallback chain
+            self.translations.clear()
+        return path
 
     def get_supported_languages(self) -> List[str]:
         '''
         Get list of supported languages
         '''
-        return list(self.translations.keys())
+        if not os.path.isdir(self.catalog_dir):
+            return []
+        return sorted(name[:-len('.json')] for name in os.listdir(self.catalog_dir)
+                      if name.endswith('.json') and _valid_language(name[:-len('.json')]))
 
 # Usage Example
 def main():
@@ -986,5 +4287,41 @@ def main():
     print(f"\nEnglish: {language_support.translate('dashboard', 'english')}")
     print(f"Hindi: {language_support.translate('dashboard', 'hindi')}")
 
+def cli(argv: List[str] = None):
+    '''
+    Command line entry point; runs the usage example when no command is given
+    '''
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Enhanced Ayurvedic Healthcare System')
+    parser.add_argument('--users-db', default='users.db')
+    parser.add_argument('--patients-db', default='patients.db')
+    commands = parser.add_subparsers(dest='command')
+
+    ingest = commands.add_parser('ingest', help='bulk load assessments from CSV or JSONL')
+    ingest.add_argument('path')
+    ingest.add_argument('--format', choices=['csv', 'jsonl'], help='defaults to the file extension')
+    ingest.add_argument('--chunk-size', type=int, default=5000)
+    ingest.add_argument('--max-errors', type=int, default=20, help='validation errors to print')
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return
+
+    ayurvedic_system = EnhancedAyurvedicHealthcareSystem(
+        lazy=True, users_db=args.users_db, patients_db=args.patients_db
+    )
+
+    if args.command == 'ingest':
+        stats = ayurvedic_system.ingest_assessment_file(args.path, args.format, args.chunk_size, args.max_errors)
+        for error in stats['errors'][:args.max_errors]:
+            print(f"Row {error['row']}: {error['error']}", file=sys.stderr)
+        print(f"Inserted {stats['inserted']} assessments, {stats['failed']} rejected "
+              f"in {stats['elapsed_seconds']:.2f}s ({stats['rows_per_second']:.0f} rows/s)")
+
+    ayurvedic_system.close()
+
 if __name__ == "__main__":
-    main()
+    cli()
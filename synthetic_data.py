@@ -0,0 +1,453 @@
+
+# ========================================
+# SYNTHETIC DATA GENERATOR
+# Deterministic, plausible users.db / patients.db content at scale
+# ========================================
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from werkzeug.security import generate_password_hash
+
+from enhanced_ayurvedic_healthcare_system import (
+    ASSESSMENT_INSERT_COLUMNS, DOSHA_CATEGORICAL_WEIGHTS, DOSHA_TYPES, NUTRITION_ACTIVITY_MULTIPLIERS,
+    NUTRITION_MACRO_SHARES, NUTRITION_MICRONUTRIENTS, EnhancedAyurvedicHealthcareSystem
+)
+
+SYNTHETIC_PASSWORD = 'synthetic-password'
+
+SYNTHETIC_FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Amit', 'Ananya', 'Arjun', 'Deepa', 'Divya', 'Gaurav', 'Isha', 'Karan',
+    'Kavya', 'Lakshmi', 'Manoj', 'Meera', 'Neha', 'Nikhil', 'Pooja', 'Priya', 'Rahul', 'Ravi',
+    'Rohan', 'Sanjay', 'Shreya', 'Sneha', 'Suresh', 'Tanvi', 'Varun', 'Vikram', 'Yash', 'Zoya'
+)
+SYNTHETIC_LAST_NAMES = (
+    'Agarwal', 'Banerjee', 'Bhat', 'Chopra', 'Das', 'Desai', 'Gupta', 'Iyer', 'Joshi', 'Kapoor',
+    'Kulkarni', 'Kumar', 'Menon', 'Mishra', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma',
+    'Singh', 'Srinivasan', 'Verma', 'Yadav'
+)
+SYNTHETIC_HOSPITALS = (
+    'Delhi AIIMS', 'Mumbai KEM', 'Pune Sassoon', 'Chennai Stanley', 'Kolkata SSKM', 'Bengaluru Victoria',
+    'Hyderabad Osmania', 'Jaipur SMS', 'Lucknow KGMU', 'Ahmedabad Civil', 'Kochi General', 'Varanasi BHU'
+)
+SYNTHETIC_SPECIALIZATIONS = ('Ayurvedic Medicine', 'Kayachikitsa', 'Panchakarma', 'Dietetics', 'General Medicine')
+SYNTHETIC_OCCUPATIONS = ('Student', 'Teacher', 'Engineer', 'Farmer', 'Homemaker', 'Retired', 'Clerk', 'Business', 'Driver')
+
+# Population share of each latent constitution, ordered as DOSHA_TYPES
+SYNTHETIC_DOSHA_SHARES = (0.35, 0.35, 0.30)
+# Probability that an Ayurvedic trait follows the patient's latent dosha
+SYNTHETIC_TRAIT_FIDELITY = 0.7
+# Trait values without scoring rules, by latent dosha
+SYNTHETIC_EXTRA_TRAITS = {
+    'hair_type': {'Vata': 'Dry', 'Pitta': 'Fine', 'Kapha': 'Thick'},
+    'appetite': {'Vata': 'Variable', 'Pitta': 'Strong', 'Kapha': 'Steady'},
+    'bowel_movements': {'Vata': 'Irregular', 'Pitta': 'Loose', 'Kapha': 'Regular'}
+}
+# Lifestyle answers with their population probabilities
+SYNTHETIC_LIFESTYLE = {
+    'smoking': (('Never', 'Former', 'Current'), (0.72, 0.13, 0.15)),
+    'alcohol': (('Never', 'Occasional', 'Regular'), (0.55, 0.35, 0.10)),
+    'exercise': (tuple(NUTRITION_ACTIVITY_MULTIPLIERS), (0.30, 0.30, 0.25, 0.15)),
+    'sleep_quality': (('Good', 'Fair', 'Poor'), (0.50, 0.35, 0.15)),
+    'stress_level': (('Low', 'Moderate', 'High'), (0.35, 0.45, 0.20)),
+    'caffeine_intake': (('None', 'Low', 'Moderate', 'High'), (0.20, 0.35, 0.35, 0.10))
+}
+
+# Explicit ids let diet plans reference assessments without reading them back
+SYNTHETIC_ASSESSMENT_COLUMNS = ('id',) + ASSESSMENT_INSERT_COLUMNS + ('diagnosed_dosha', 'dosha_confidence')
+
+def _dosha_trait_options(field: str) -> Dict:
+    '''
+    For a scored Ayurvedic field, the value each dosha favors most (None if no value favors it)
+    '''
+    rules = DOSHA_CATEGORICAL_WEIGHTS[field]
+    favored = {}
+    for index, dosha in enumerate(DOSHA_TYPES):
+        best = max(rules, key=lambda value: rules[value][index])
+        favored[dosha] = best if rules[best][index] > 0 else None
+    return favored
+
+class SyntheticDataGenerator:
+    '''
+    Seeded generator of users, doctor/patient profiles, assessments and diet
+    plans matching the init_databases schema. Everything is vectorized with
+    NumPy and written with executemany in chunked transactions; the same
+    seed and sizes always produce the same rows.
+    '''
+
+    def __init__(self, system: EnhancedAyurvedicHealthcareSystem, seed: int = 0,
+                 precomputed_hash: bool = True, password: str = SYNTHETIC_PASSWORD,
+                 chunk_size: int = 50000, start_date: str = '2021-01-01', span_days: int = 3 * 365):
+        self.system = system
+        self.rng = np.random.default_rng(seed)
+        self.precomputed_hash = precomputed_hash
+        self.password = password
+        self.chunk_size = chunk_size
+        self.start_date = datetime.fromisoformat(start_date)
+        self.span_days = span_days
+        self._shared_hash = None
+
+    # ---------- users ----------
+
+    def _next_id(self, connection, table: str) -> int:
+        return connection.execute(f'SELECT COALESCE(MAX(id), 0) + 1 FROM {table}').fetchone()[0]
+
+    def _names(self, count: int) -> List[str]:
+        first = self.rng.choice(SYNTHETIC_FIRST_NAMES, count)
+        last = self.rng.choice(SYNTHETIC_LAST_NAMES, count)
+        return np.char.add(np.char.add(first, ' '), last).tolist()
+
+    def _phones(self, count: int) -> List[str]:
+        return self.rng.integers(6_000_000_000, 10_000_000_000, count).astype(str).tolist()
+
+    def _password_hashes(self, count: int):
+        '''
+        One shared hash when precomputed_hash is set, else a real hash per user
+        '''
+        if self.precomputed_hash:
+            if self._shared_hash is None:
+                self._shared_hash = generate_password_hash(self.password)
+            return (self._shared_hash for _ in range(count))
+        return (self.system.hash_password(self.password) for _ in range(count))
+
+    def generate_users(self, doctors: int, patients: int, admins: int = 0) -> Dict:
+        '''
+        Insert admins, doctors and patients with their profiles. Patients are
+        assigned to doctors with a skewed (log-normal) caseload.
+        '''
+        connection = self.system.conn_users
+        first_id = self._next_id(connection, 'users')
+        total = admins + doctors + patients
+        ids = np.arange(first_id, first_id + total)
+        roles = np.repeat(['admin', 'doctor', 'patient'], [admins, doctors, patients])
+        admin_ids, doctor_ids, patient_ids = np.split(ids, [admins, admins + doctors])
+
+        caseload = self.rng.lognormal(0, 0.6, doctors)
+        assigned = self.rng.choice(doctor_ids, patients, p=caseload / caseload.sum()) if doctors else np.zeros(patients, int)
+
+        with connection:
+            for offset in range(0, total, self.chunk_size):
+                chunk = slice(offset, min(offset + self.chunk_size, total))
+                size = chunk.stop - chunk.start
+                connection.executemany(
+                    'INSERT INTO users (id, email, password_hash, role, name, phone) VALUES (?, ?, ?, ?, ?, ?)',
+                    zip(ids[chunk].tolist(),
+                        (f'{role}{user_id}@synthetic.local' for role, user_id in zip(roles[chunk], ids[chunk].tolist())),
+                        self._password_hashes(size), roles[chunk].tolist(), self._names(size), self._phones(size))
+                )
+            connection.executemany(
+                'INSERT INTO admin_profiles (user_id, govt_employee_id, job_location) VALUES (?, ?, ?)',
+                zip(admin_ids.tolist(), (f'GOV{user_id:08d}' for user_id in admin_ids.tolist()),
+                    self.rng.choice(SYNTHETIC_HOSPITALS, admins).tolist())
+            )
+            connection.executemany('''
+                INSERT INTO doctor_profiles
+                (user_id, license_number, govt_id, hospital_location, practice_years, specialization)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', zip(doctor_ids.tolist(), (f'LIC{user_id:08d}' for user_id in doctor_ids.tolist()),
+                     (f'GID{user_id:08d}' for user_id in doctor_ids.tolist()),
+                     self.rng.choice(SYNTHETIC_HOSPITALS, doctors).tolist(),
+                     self.rng.integers(1, 40, doctors).tolist(),
+                     self.rng.choice(SYNTHETIC_SPECIALIZATIONS, doctors).tolist()))
+            connection.executemany(
+                'INSERT INTO patient_profiles (user_id, emergency_contact, assigned_doctor_id) VALUES (?, ?, ?)',
+                zip(patient_ids.tolist(), self._phones(patients), assigned.tolist())
+            )
+
+        return {'admin_ids': admin_ids, 'doctor_ids': doctor_ids, 'patient_ids': patient_ids,
+                'assigned_doctor': assigned}
+
+    # ---------- assessments ----------
+
+    def _patient_traits(self, count: int) -> Dict:
+        '''
+        Stable per-patient attributes: demographics, baseline body size, latent dosha and habits
+        '''
+        rng = self.rng
+        dosha = rng.choice(len(DOSHA_TYPES), count, p=SYNTHETIC_DOSHA_SHARES)
+        male = rng.random(count) < 0.5
+        height = np.where(male, rng.normal(170, 7, count), rng.normal(157, 6, count)).clip(135, 200)
+        # Kapha constitutions skew heavier, Vata lighter
+        bmi = (rng.lognormal(np.log(23.5), 0.16, count) + np.choose(dosha, [-1.5, 0.0, 2.5])).clip(15, 48)
+        age = rng.integers(18, 86, count)
+        # Diabetes prevalence rises with BMI and age
+        diabetes_risk = 0.04 + 0.012 * np.maximum(bmi - 25, 0) + 0.002 * np.maximum(age - 40, 0)
+        traits = {
+            'dosha': dosha,
+            'gender': np.where(male, 'Male', 'Female'),
+            'age': age,
+            'height': height,
+            'bmi': bmi,
+            'occupation': rng.choice(SYNTHETIC_OCCUPATIONS, count),
+            'diabetic': rng.random(count) < diabetes_risk
+        }
+        for field, (values, probabilities) in SYNTHETIC_LIFESTYLE.items():
+            traits[field] = rng.choice(values, count, p=probabilities)
+        return traits
+
+    def _ayurvedic_fields(self, dosha: np.ndarray) -> Dict:
+        '''
+        Trait answers that follow the latent dosha with SYNTHETIC_TRAIT_FIDELITY
+        '''
+        count = len(dosha)
+        fields = {}
+        options = {field: _dosha_trait_options(field) for field in DOSHA_CATEGORICAL_WEIGHTS}
+        options.update(SYNTHETIC_EXTRA_TRAITS)
+        for field, favored in options.items():
+            choices = np.array(sorted(set(DOSHA_CATEGORICAL_WEIGHTS.get(field, {})) | (set(favored.values()) - {None})))
+            values = self.rng.choice(choices, count)
+            follows = self.rng.random(count) < SYNTHETIC_TRAIT_FIDELITY
+            for index, dosha_name in enumerate(DOSHA_TYPES):
+                if favored[dosha_name] is not None:
+                    values[follows & (dosha == index)] = favored[dosha_name]
+            fields[field] = values
+        return fields
+
+    def _assessment_columns(self, traits: Dict, patient_index: np.ndarray, seconds: np.ndarray) -> Dict:
+        '''
+        Vitals, labs and answers for one chunk of assessments (row -> patient_index),
+        seconds being each visit's offset from start_date
+        '''
+        rng = self.rng
+        count = len(patient_index)
+        dosha = traits['dosha'][patient_index]
+        years = seconds / (365.25 * 86400)
+        age = traits['age'][patient_index] + years.astype(int)
+        height = traits['height'][patient_index]
+        # Weight wanders further from baseline the later the visit
+        bmi = (traits['bmi'][patient_index] + rng.normal(0, 0.8, count) * np.sqrt(years)).clip(15, 50)
+        weight = bmi * (height / 100) ** 2
+        diabetic = traits['diabetic'][patient_index]
+
+        systolic = 100 + 0.45 * age + 1.1 * (bmi - 22) + rng.normal(0, 11, count)
+        diastolic = 0.55 * systolic + 12 + rng.normal(0, 6, count)
+        fasting = np.where(diabetic, rng.normal(138, 25, count), rng.normal(92, 9, count)).clip(60, 350)
+        total_cholesterol = rng.normal(185 + 0.4 * age, 32, count).clip(110, 360)
+        hdl = np.where(traits['gender'][patient_index] == 'Female', rng.normal(56, 11, count),
+                       rng.normal(47, 10, count)).clip(20, 110)
+
+        columns = {
+            'patient_id': traits['ids'][patient_index],
+            'doctor_id': traits['doctor'][patient_index],
+            'age': age,
+            'gender': traits['gender'][patient_index],
+            'height': height.round(1),
+            'weight': weight.round(1),
+            'occupation': traits['occupation'][patient_index],
+            'systolic_bp': systolic.round().astype(int),
+            'diastolic_bp': diastolic.round().astype(int),
+            'heart_rate': (rng.normal(73, 8, count) + np.choose(dosha, [6, 1, -5])).round().astype(int),
+            'temperature': rng.normal(98.4, 0.4, count).round(1),
+            'respiratory_rate': rng.integers(12, 21, count),
+            'oxygen_saturation': rng.normal(97.5, 1.2, count).clip(88, 100).round(1),
+            'fasting_glucose': fasting.round(1),
+            'post_meal_glucose': (fasting + rng.normal(38, 14, count).clip(5, None)).round(1),
+            'total_cholesterol': total_cholesterol.round(1),
+            'hdl_cholesterol': hdl.round(1),
+            'ldl_cholesterol': (total_cholesterol - hdl - rng.normal(28, 8, count)).clip(40, None).round(1),
+            **{field: traits[field][patient_index] for field in SYNTHETIC_LIFESTYLE},
+            **self._ayurvedic_fields(dosha)
+        }
+        # Same BMI arithmetic as the ingestion path, from the stored height and weight
+        columns['bmi'] = columns['weight'] / (columns['height'] / 100) ** 2
+        return columns
+
+    def generate_assessments(self, users: Dict, assessments: int) -> Dict:
+        '''
+        Distribute `assessments` visits over the patients (skewed, at least one
+        each while they last), date them in order per patient, score them with
+        the batch dosha rules and bulk insert in chunks
+        '''
+        rng = self.rng
+        patient_ids = users['patient_ids']
+        patients = len(patient_ids)
+        traits = self._patient_traits(patients)
+        traits['ids'] = patient_ids
+        traits['doctor'] = users['assigned_doctor']
+
+        # Visits per patient: one each, the rest multinomial over gamma-skewed weights
+        if assessments >= patients:
+            weights = rng.gamma(2.0, 1.0, patients)
+            visits = 1 + rng.multinomial(assessments - patients, weights / weights.sum())
+        else:
+            visits = np.zeros(patients, dtype=int)
+            visits[rng.choice(patients, assessments, replace=False)] = 1
+
+        connection = self.system.conn_patients
+        first_id = self._next_id(connection, 'patient_assessments')
+        placeholders = ', '.join(['?'] * len(SYNTHETIC_ASSESSMENT_COLUMNS))
+        sql = f"INSERT INTO patient_assessments ({', '.join(SYNTHETIC_ASSESSMENT_COLUMNS)}) VALUES ({placeholders})"
+
+        # Rows are grouped by patient; sorting offsets within each group keeps
+        # every patient's visits in date order
+        patient_index = np.repeat(np.arange(patients), visits)
+        offsets = rng.random(len(patient_index))
+        offsets = offsets[np.lexsort((offsets, patient_index))]
+        seconds = (offsets * self.span_days * 86400).astype('int64')
+
+        written = 0
+        assessment_dosha = []
+        for offset in range(0, len(patient_index), self.chunk_size):
+            chunk = slice(offset, min(offset + self.chunk_size, len(patient_index)))
+            columns = self._assessment_columns(traits, patient_index[chunk], seconds[chunk])
+            diagnosis = self.system.diagnose_dosha_batch(columns)
+            columns['diagnosed_dosha'] = diagnosis['primary_dosha']
+            columns['dosha_confidence'] = diagnosis['confidence_scores'].max(axis=1).round(4)
+            columns['id'] = np.arange(first_id + chunk.start, first_id + chunk.stop)
+            columns['assessment_date'] = [
+                (self.start_date + timedelta(seconds=value)).isoformat(' ') for value in seconds[chunk].tolist()
+            ]
+            with connection:
+                connection.executemany(sql, zip(*(
+                    columns[column] if isinstance(columns[column], list) else columns[column].tolist()
+                    for column in SYNTHETIC_ASSESSMENT_COLUMNS
+                )))
+            assessment_dosha.append(diagnosis['primary_dosha'])
+            written += chunk.stop - chunk.start
+
+        return {
+            'count': written,
+            'first_id': first_id,
+            'patient_index': patient_index,
+            'seconds': seconds,
+            'dosha': np.concatenate(assessment_dosha) if assessment_dosha else np.array([], dtype=object),
+            'traits': traits
+        }
+
+    # ---------- diet plans ----------
+
+    def generate_diet_plans(self, assessments: Dict, fraction: float) -> int:
+        '''
+        Weekly plans for a random `fraction` of assessments; only each patient's
+        latest plan stays active. Plan bodies are shared per dosha, targets are
+        computed per patient with the batch nutrition calculator.
+        '''
+        count = assessments['count']
+        chosen = np.flatnonzero(self.rng.random(count) < fraction)
+        if not len(chosen):
+            return 0
+
+        system = self.system
+        traits = assessments['traits']
+        patient_index = assessments['patient_index'][chosen]
+        latest = np.ones(len(chosen), dtype=bool)
+        latest[:-1] = patient_index[1:] != patient_index[:-1]
+
+        height = traits['height'][patient_index]
+        requirements = system.calculate_nutritional_requirements_batch({
+            'age': traits['age'][patient_index],
+            'gender': traits['gender'][patient_index],
+            'exercise': traits['exercise'][patient_index],
+            'height': height,
+            'weight': traits['bmi'][patient_index] * (height / 100) ** 2
+        })
+
+        connection = system.conn_patients
+        sql = '''
+            INSERT INTO diet_plans (patient_id, doctor_id, assessment_id, plan_type, created_date,
+                                    start_date, end_date, plan_data, nutritional_targets, is_active)
+            VALUES (?, ?, ?, 'weekly', ?, ?, ?, ?, ?, ?)
+        '''
+        reference = system.calculate_nutritional_requirements({})
+        plan_data = None
+
+        for offset in range(0, len(chosen), self.chunk_size):
+            chunk = slice(offset, min(offset + self.chunk_size, len(chosen)))
+            if plan_data is None:
+                plan_data = {
+                    dosha: system.encode_plan_data(system.generate_weekly_diet_plan(dosha, reference))
+                    for dosha in DOSHA_TYPES
+                }
+            # Rows are encoded before the transaction opens, since interning
+            # new plan strings takes the write lock
+            rows = self._diet_plan_rows(chosen, chunk, patient_index, latest, requirements, plan_data, assessments)
+            try:
+                connection.executemany(sql, rows)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+        return len(chosen)
+
+    def _diet_plan_rows(self, chosen, chunk: slice, patient_index, latest, requirements, plan_data, assessments):
+        '''
+        Parameter tuples for one chunk of diet_plans rows
+        '''
+        system = self.system
+        traits = assessments['traits']
+        macros = (*NUTRITION_MACRO_SHARES, 'fiber')
+        rows = []
+        for position in range(chunk.start, chunk.stop):
+            row = chosen[position]
+            created = self.start_date + timedelta(seconds=int(assessments['seconds'][row]))
+            target = requirements[position]
+            targets = {
+                'daily_calories': int(target['daily_calories']),
+                'macronutrients': {macro: int(target[macro]) for macro in macros},
+                'micronutrients': {nutrient: int(target[nutrient]) for nutrient in NUTRITION_MICRONUTRIENTS['male']}
+            }
+            rows.append((
+                int(traits['ids'][patient_index[position]]), int(traits['doctor'][patient_index[position]]),
+                assessments['first_id'] + int(row), created.isoformat(' '),
+                created.date().isoformat(), (created.date() + timedelta(days=6)).isoformat(),
+                plan_data[assessments['dosha'][row]], system.encode_plan_data(targets),
+                bool(latest[position])
+            ))
+        return rows
+
+    def generate(self, doctors: int, patients: int, assessments: int, admins: int = 0,
+                 plan_fraction: float = 0.3) -> Dict:
+        '''
+        Populate both databases and return row counts and timing
+        '''
+        start = time.perf_counter()
+        users = self.generate_users(doctors, patients, admins)
+        generated = self.generate_assessments(users, assessments)
+        plans = self.generate_diet_plans(generated, plan_fraction)
+        self.system.report_cache.clear()
+        elapsed = time.perf_counter() - start
+        rows = admins + doctors + patients + generated['count'] + plans
+        return {
+            'admins': admins,
+            'doctors': doctors,
+            'patients': patients,
+            'assessments': generated['count'],
+            'diet_plans': plans,
+            'first_doctor_id': int(users['doctor_ids'][0]) if doctors else None,
+            'first_patient_id': int(users['patient_ids'][0]) if patients else None,
+            'first_assessment_id': generated['first_id'],
+            'elapsed_seconds': elapsed,
+            'rows_per_second': rows / elapsed if elapsed > 0 else 0.0
+        }
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Generate deterministic synthetic healthcare data')
+    parser.add_argument('--users-db', default='users.db')
+    parser.add_argument('--patients-db', default='patients.db')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--admins', type=int, default=10)
+    parser.add_argument('--doctors', type=int, default=1000)
+    parser.add_argument('--patients', type=int, default=100000)
+    parser.add_argument('--assessments', type=int, default=1000000)
+    parser.add_argument('--plan-fraction', type=float, default=0.3, help='share of assessments given a diet plan')
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--hash-each-password', action='store_true',
+                        help='hash every password instead of sharing one precomputed hash (slow)')
+    args = parser.parse_args(argv)
+
+    system = EnhancedAyurvedicHealthcareSystem(lazy=True, users_db=args.users_db, patients_db=args.patients_db)
+    generator = SyntheticDataGenerator(system, seed=args.seed, precomputed_hash=not args.hash_each_password,
+                                       chunk_size=args.chunk_size)
+    stats = generator.generate(args.doctors, args.patients, args.assessments, args.admins, args.plan_fraction)
+    system.close()
+
+    print(f"Generated {stats['admins']} admins, {stats['doctors']} doctors, {stats['patients']} patients, "
+          f"{stats['assessments']} assessments and {stats['diet_plans']} diet plans "
+          f"in {stats['elapsed_seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()